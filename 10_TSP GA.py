@@ -5,12 +5,17 @@ Created on Sat Apr 11 14:15:54 2020
 @author: sami
 """
 
-import numpy as np, random, operator, pandas as pd, matplotlib.pyplot as plt
+import numpy as np, random, itertools
+from gaengine import Genome, GeneticAlgorithm, IslandModel, rouletteselection
+from progress import CallbackObserver
 
 class City:
+    numbering = itertools.count() #every city gets its own index
+    
     def __init__(self, x, y):
         self.x = x
         self.y = y
+        self.index = next(City.numbering)
     
     def distance(self, city):
         xDis = abs(self.x - city.x)
@@ -21,6 +26,14 @@ class City:
     def __repr__(self):
         return "(" + str(self.x) + "," + str(self.y) + ")"
 
+    #cities are compared by index, so two cities at the same location stay distinct while
+    #copies of a city (e.g. in routes sent between island processes) are still the same city
+    def __eq__(self, city):
+        return isinstance(city, City) and self.index == city.index
+
+    def __hash__(self):
+        return hash(self.index)
+
 
 
 class Fitness:
@@ -64,41 +77,6 @@ def initialPopulation(popSize, cityList):
     return population
 
 
-def rankRoutes(population):
-    fitnessResults = {}
-    for i in range(0,len(population)):
-        fitnessResults[i] = Fitness(population[i]).routeFitness()
-    return sorted(fitnessResults.items(), key = operator.itemgetter(1), reverse = True)
-
-
-
-
-def selection(popRanked, eliteSize):
-    selectionResults = []
-    df = pd.DataFrame(np.array(popRanked), columns=["Index","Fitness"])
-    df['cum_sum'] = df.Fitness.cumsum()
-    df['cum_perc'] = 100*df.cum_sum/df.Fitness.sum()
-    
-    for i in range(0, eliteSize):
-        selectionResults.append(popRanked[i][0])
-    for i in range(0, len(popRanked) - eliteSize):
-        pick = 100*random.random()
-        for i in range(0, len(popRanked)):
-            if pick <= df.iat[i,3]:
-                selectionResults.append(popRanked[i][0])
-                break
-    return selectionResults
-
-
-
-def matingPool(population, selectionResults):
-    matingpool = []
-    for i in range(0, len(selectionResults)):
-        index = selectionResults[i]
-        matingpool.append(population[index])
-    return matingpool
-
-
 def breed(parent1, parent2):
     child = []
     childP1 = []
@@ -120,22 +98,6 @@ def breed(parent1, parent2):
 
 
 
-def breedPopulation(matingpool, eliteSize):
-    children = []
-    length = len(matingpool) - eliteSize
-    pool = random.sample(matingpool, len(matingpool))
-
-    for i in range(0,eliteSize):
-        children.append(matingpool[i])
-    
-    for i in range(0, length):
-        child = breed(pool[i], pool[len(matingpool)-i-1])
-        children.append(child)
-    return children
-
-
-
-
 def mutate(individual, mutationRate):
     for swapped in range(len(individual)):
         if(random.random() < mutationRate):
@@ -151,70 +113,82 @@ def mutate(individual, mutationRate):
 
 
 
-def mutatePopulation(population, mutationRate):
-    mutatedPop = []
-    
-    for ind in range(0, len(population)):
-        mutatedInd = mutate(population[ind], mutationRate)
-        mutatedPop.append(mutatedInd)
-    return mutatedPop
+class RouteGenome(Genome):
+    """Routes through the cities for the GA engine: ordered crossover (breed) and swap mutation (mutate)."""
 
+    def __init__(self, cityList, mutationRate):
+        self.cityList = cityList
+        self.mutationRate = mutationRate
 
+    def random(self, count):
+        return initialPopulation(count, self.cityList)
 
-def nextGeneration(currentGen, eliteSize, mutationRate):
-    popRanked = rankRoutes(currentGen)
-    selectionResults = selection(popRanked, eliteSize)
-    matingpool = matingPool(currentGen, selectionResults)
-    children = breedPopulation(matingpool, eliteSize)
-    nextGeneration = mutatePopulation(children, mutationRate)
-    return nextGeneration
+    def crossover(self, parents1, parents2):
+        return ([breed(parent1, parent2) for parent1, parent2 in zip(parents1, parents2)],
+                [breed(parent2, parent1) for parent1, parent2 in zip(parents1, parents2)])
 
+    def mutate(self, population):
+        return [mutate(individual, self.mutationRate) for individual in population]
 
+    def key(self, gene):
+        return tuple([city.index for city in gene])
 
-def geneticAlgorithm(population, popSize, eliteSize, mutationRate, generations):
-    pop = initialPopulation(popSize, population)
-    print("Initial distance: " + str(1 / rankRoutes(pop)[0][1]))
-    
-    for i in range(0, generations):
-        pop = nextGeneration(pop, eliteSize, mutationRate)
-    
-    print("Final distance: " + str(1 / rankRoutes(pop)[0][1]))
-    bestRouteIndex = rankRoutes(pop)[0][0]
-    bestRoute = pop[bestRouteIndex]
-    return bestRoute
 
 
+def routeFitnesses(population):
+    return [Fitness(route).routeFitness() for route in population]
 
-cityList = []
 
-for i in range(0,25):
-    cityList.append(City(x=int(random.random() * 200), y=int(random.random() * 200)))
-    
-#geneticAlgorithm(population=cityList, popSize=100, eliteSize=20, mutationRate=0.01, generations=500)
 
+def createEngine(population, popSize, eliteSize, mutationRate, cacheSize=4096, islands=1, migrationInterval=20, migrationSize=2, topology='ring'):
+    """A GA engine (gaengine.py) for the routes, with islands > 1 an IslandModel of that many populations."""
+    engines = [GeneticAlgorithm(RouteGenome(population, mutationRate), routeFitnesses, popSize, rouletteselection, eliteSize, cacheSize)
+               for island in range(0, islands)]
+    if islands > 1:
+        return IslandModel(engines, migrationInterval, migrationSize, topology, seed=random.getrandbits(32))
+    return engines[0]
 
 
 
-def geneticAlgorithmPlot(population, popSize, eliteSize, mutationRate, generations):
-    pop = initialPopulation(popSize, population)
+def geneticAlgorithm(population, popSize, eliteSize, mutationRate, generations, cacheSize=4096, islands=1, migrationInterval=20, migrationSize=2, topology='ring'):
+    engine = createEngine(population, popSize, eliteSize, mutationRate, cacheSize, islands, migrationInterval, migrationSize, topology)
+    engine.initialize()
+    print("Initial distance: " + str(1 / engine.best_fitness))
+    
+    bestRoute, bestFitness = engine.run(generations)
+    if islands > 1:
+        engine.close()
+    
+    print("Final distance: " + str(1 / bestFitness))
+    print("Fitness cache hit rate: " + str(engine.hitrate()))
+    return bestRoute
+
+
+
+def geneticAlgorithmPlot(population, popSize, eliteSize, mutationRate, generations, cacheSize=4096, islands=1, migrationInterval=20, migrationSize=2, topology='ring'):
+    import matplotlib.pyplot as plt
+    engine = createEngine(population, popSize, eliteSize, mutationRate, cacheSize, islands, migrationInterval, migrationSize, topology)
     progress = []
-    progress.append(1 / rankRoutes(pop)[0][1])
     
-    for i in range(0, generations):
-        pop = nextGeneration(pop, eliteSize, mutationRate)
-        progress.append(1 / rankRoutes(pop)[0][1])
+    engine.run(generations, [CallbackObserver(lambda generation, population_best_fitness, **state: progress.append(1 / population_best_fitness))])
+    if islands > 1:
+        engine.close()
     
+    print("Fitness cache hit rate: " + str(engine.hitrate()))
     plt.plot(progress)
     plt.ylabel('Distance')
-    plt.xlabel('Generation')
+    plt.xlabel('Generation' if islands == 1 else 'Migration')
     plt.show()
 
-geneticAlgorithmPlot(population=cityList, popSize=100, eliteSize=20, mutationRate=0.01, generations=500)
-
-
-
-
 
 
+if __name__ == "__main__":
+    cityList = []
 
+    for i in range(0,25):
+        cityList.append(City(x=int(random.random() * 200), y=int(random.random() * 200)))
+        
+    #geneticAlgorithm(population=cityList, popSize=100, eliteSize=20, mutationRate=0.01, generations=500)
+    #geneticAlgorithm(population=cityList, popSize=100, eliteSize=20, mutationRate=0.01, generations=500, islands=4)
 
+    geneticAlgorithmPlot(population=cityList, popSize=100, eliteSize=20, mutationRate=0.01, generations=500)
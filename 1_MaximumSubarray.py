@@ -1,6 +1,8 @@
 import numpy as np
 import sys
 import math
+import collections
+import concurrent.futures
 from timeit import default_timer as timer
 from datetime import timedelta
 
@@ -97,33 +99,334 @@ def kadanemaximumsubarray(A):
             bestright = right
 
     return bestleft, bestright, maxsum
+
+def batchedmaximumsubarray(A, blocksize=64):
+    """Find the maximum subarray of every row of the 2-D array A in one call.
+
+    Vectorized over rows using prefix sums: the best subarray ending at j has sum
+    P[j+1] - min(P[0..j]), so a running minimum replaces the per-element loop of
+    Kadane's algorithm. Ties are resolved exactly as kadanemaximumsubarray resolves
+    them. Rows are processed blocksize at a time (transposed, so every accumulate
+    runs down contiguous memory) to keep the temporaries small and in cache.
+    """
+    A = np.atleast_2d(A)
+    rows, n = A.shape
+    lefts = np.zeros(rows, dtype=np.int64)
+    rights = np.zeros(rows, dtype=np.int64)
+    sums = np.zeros(rows, dtype=np.result_type(A.dtype, np.int64))
+    positions = np.arange(n)[:, None]
+
+    for start in range(0, rows, blocksize):
+        block = A[start:start+blocksize]
+        b = len(block)
+        columns = np.arange(b)
+
+        #prefix sums with a leading zero row, P[k] = sum of the first k elements
+        P = np.empty((n+1, b), dtype=sums.dtype)
+        P[0] = 0
+        np.cumsum(block.T, axis=0, out=P[1:])
+
+        #best sum ending at each position, argmax keeps the first (leftmost) maximum
+        runmin = np.minimum.accumulate(P[:-1], axis=0)
+        ending = P[1:] - runmin
+        right = np.argmax(ending, axis=0)
+
+        #Kadane restarts whenever the running sum is <= 0, so the left index is the
+        #latest position up to right where the running minimum is attained
+        attained = (P[:-1] == runmin[right, columns]) & (positions <= right)
+        left = n - 1 - np.argmax(attained[::-1], axis=0)
+
+        lefts[start:start+b] = left
+        rights[start:start+b] = right
+        sums[start:start+b] = ending[right, columns]
+
+    return lefts, rights, sums
+    
+def maximumsubrectangle(G):
+    """Find the maximum-sum sub-rectangle of the 2-D array G.
+
+    For each top row, the column sums of every rectangle from that top row down to
+    each bottom row are read off row prefix sums, giving one series per bottom row.
+    All of those series are solved together by batchedmaximumsubarray (Kadane over
+    the columns). G is transposed if needed so the row pairs run over the smaller
+    dimension, for O(min(m,n)^2 * max(m,n)) work.
+
+    Returns top, left, bottom, right (inclusive) and the sum.
+    """
+    G = np.asarray(G)
+    transposed = G.shape[0] > G.shape[1]
+    if transposed:
+        G = G.T
+    m, n = G.shape
+
+    R = np.zeros((m+1, n), dtype=np.result_type(G.dtype, np.int64))   #R[k] = sum of the first k rows
+    np.cumsum(G, axis=0, out=R[1:])
+
+    best = (0, 0, 0, 0, float('-Inf'))
+    for top in range(0, m):
+        lefts, rights, sums = batchedmaximumsubarray(R[top+1:] - R[top])
+        k = int(np.argmax(sums))
+        if sums[k] > best[4]:
+            best = (top, int(lefts[k]), top + k, int(rights[k]), sums[k])
+
+    top, left, bottom, right, sum = best
+    if transposed:
+        return left, top, right, bottom, sum
+    return top, left, bottom, right, sum
+
+class SubarraySummary:
+    """Mergeable summary of a contiguous chunk of a series for the maximum subarray problem.
+
+    Holds the chunk total, the best prefix (ending at prefixright), the best suffix
+    (starting at suffixleft) and the best interior subarray. All indices are global.
+    """
+    __slots__ = ('low', 'high', 'total', 'prefixright', 'prefixsum', 'suffixleft', 'suffixsum', 'left', 'right', 'sum')
+
+    def __init__(self, low, high, total, prefixright, prefixsum, suffixleft, suffixsum, left, right, sum):
+        self.low = low
+        self.high = high
+        self.total = total
+        self.prefixright = prefixright
+        self.prefixsum = prefixsum
+        self.suffixleft = suffixleft
+        self.suffixsum = suffixsum
+        self.left = left
+        self.right = right
+        self.sum = sum
+
+    def __repr__(self):
+        return str("Subarray summary") + str({k: getattr(self, k) for k in self.__slots__})
+    def __str__(self):
+        return self.__repr__()
+
+def summarizesubarraychunk(chunk, offset=0):
+    """Reduce one chunk of a series (starting at global index offset) to a SubarraySummary."""
+    chunk = np.asarray(chunk)
+    n = len(chunk)
+    P = np.cumsum(chunk)
+    total = P[n-1]
+
+    prefixright = int(np.argmax(P))         #best prefix ends here
+    suffixleft = int(np.argmin(P[:-1])) + 1 if n > 1 else 0
+    suffixsum = total - (P[suffixleft-1] if suffixleft > 0 else 0)
+    if suffixsum < total:                   #the whole chunk is the best suffix
+        suffixleft = 0
+        suffixsum = total
+
+    left, right, sum = batchedmaximumsubarray(chunk)
+    return SubarraySummary(offset, offset + n - 1, total,
+                           offset + prefixright, P[prefixright],
+                           offset + suffixleft, suffixsum,
+                           offset + int(left[0]), offset + int(right[0]), sum[0])
+
+def mergesubarraysummaries(a, b):
+    """Merge the summaries of two adjacent chunks (a immediately followed by b).
+
+    This is the combine step of findmaximumsubarray: the best subarray is in the
+    left part, the right part, or crosses the boundary (best suffix of a plus best
+    prefix of b). The merge is associative, so summaries can be reduced in any grouping.
+    """
+    assert(a.high + 1 == b.low)
+
+    if a.prefixsum >= a.total + b.prefixsum:
+        prefixright, prefixsum = a.prefixright, a.prefixsum
+    else:
+        prefixright, prefixsum = b.prefixright, a.total + b.prefixsum
+
+    if b.suffixsum > b.total + a.suffixsum:
+        suffixleft, suffixsum = b.suffixleft, b.suffixsum
+    else:
+        suffixleft, suffixsum = a.suffixleft, b.total + a.suffixsum
+
+    crosssum = a.suffixsum + b.prefixsum
+    if (a.sum >= b.sum and a.sum >= crosssum):
+        left, right, sum = a.left, a.right, a.sum
+    elif (b.sum >= crosssum):
+        left, right, sum = b.left, b.right, b.sum
+    else:
+        left, right, sum = a.suffixleft, b.prefixright, crosssum
+
+    return SubarraySummary(a.low, b.high, a.total + b.total, prefixright, prefixsum,
+                           suffixleft, suffixsum, left, right, sum)
+
+def _summarizeindexedchunk(args):
+    """Process pool worker: summarize a (chunk, offset) pair."""
+    chunk, offset = args
+    return summarizesubarraychunk(chunk, offset)
+
+def streamingmaximumsubarray(chunks, chunksize=1<<20, workers=None):
+    """Find the maximum subarray of a series that need not fit in memory.
+
+    chunks is either an array (e.g. an np.memmap), which is walked chunksize elements
+    at a time, or any iterable of consecutive 1-D chunks. Each chunk is reduced to a
+    SubarraySummary and merged into a running summary, so memory stays constant.
+    With workers > 1 the chunks are summarized in a process pool, keeping at most
+    2*workers chunks in flight.
+    """
+    if isinstance(chunks, np.ndarray):
+        series = chunks
+        chunks = (series[i:i+chunksize] for i in range(0, len(series), chunksize))
+
+    def indexedchunks():
+        offset = 0
+        for chunk in chunks:
+            chunk = np.asarray(chunk)
+            if len(chunk) > 0:
+                yield chunk, offset
+                offset += len(chunk)
+
+    result = None
+    if workers is None or workers <= 1:
+        for item in indexedchunks():
+            summary = _summarizeindexedchunk(item)
+            result = summary if result is None else mergesubarraysummaries(result, summary)
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = collections.deque()
+            for item in indexedchunks():
+                pending.append(executor.submit(_summarizeindexedchunk, item))
+                while len(pending) >= 2*workers or (pending and pending[0].done()):
+                    summary = pending.popleft().result()
+                    result = summary if result is None else mergesubarraysummaries(result, summary)
+            while pending:
+                summary = pending.popleft().result()
+                result = summary if result is None else mergesubarraysummaries(result, summary)
+
+    return result.left, result.right, result.sum
+    
+class MaximumSubarrayTree:
+    """Segment tree of SubarraySummary nodes for range maximum subarray queries.
+
+    Built once over A in O(n). Every node holds the merged summary of its two
+    children (the left/right/cross decomposition of findmaximumsubarray), so
+    query(low, high) combines O(log n) nodes and update(i, value) rebuilds the
+    O(log n) nodes above a single leaf.
+    """
+
+    def __init__(self, A):
+        self.n = len(A)
+        self.size = 1
+        while self.size < self.n:
+            self.size *= 2
+        self.nodes = [None]*(2*self.size)   #None is the empty summary (padding)
+        for i in range(0, self.n):
+            self.nodes[self.size + i] = self._leaf(i, A[i])
+        for k in range(self.size - 1, 0, -1):
+            self.nodes[k] = self._merge(self.nodes[2*k], self.nodes[2*k+1])
+
+    @staticmethod
+    def _leaf(i, value):
+        return SubarraySummary(i, i, value, i, value, i, value, i, i, value)
+
+    @staticmethod
+    def _merge(a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return mergesubarraysummaries(a, b)
+
+    def update(self, i, value):
+        """Set A[i] = value."""
+        k = self.size + i
+        self.nodes[k] = self._leaf(i, value)
+        k //= 2
+        while k >= 1:
+            self.nodes[k] = self._merge(self.nodes[2*k], self.nodes[2*k+1])
+            k //= 2
+
+    def query(self, low, high):
+        """Find the maximum subarray of A[low] to A[high]."""
+        assert(0 <= low <= high < self.n)
+        leftpart = None     #summaries collected from the left end, in order
+        rightpart = None    #and from the right end, in order
+        lo = low + self.size
+        hi = high + self.size + 1
+        while lo < hi:
+            if lo & 1:
+                leftpart = self._merge(leftpart, self.nodes[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                rightpart = self._merge(self.nodes[hi], rightpart)
+            lo //= 2
+            hi //= 2
+        result = self._merge(leftpart, rightpart)
+        return result.left, result.right, result.sum
     
 #main point of entry
-n = 300
-A = np.random.randint(-10,10,n)
+if __name__ == "__main__":
+    n = 300
+    A = np.random.randint(-10,10,n)
+
+    start_time = timer()
+    [left, right, sum] = findmaximumsubarray(A, 0, n-1)
+    end_time = timer();
+    print("Divide-and-conquer time = ", timedelta(seconds=end_time-start_time))
 
-start_time = timer()
-[left, right, sum] = findmaximumsubarray(A, 0, n-1)
-end_time = timer();
-print("Divide-and-conquer time = ", timedelta(seconds=end_time-start_time))
+    bf_start_time = timer()
+    [bf_left, bf_right, bf_sum] = bruteforcemaximumsubarray(A);
+    bf_end_time = timer()
+    print("Brute-force time = ", timedelta(seconds=bf_end_time-bf_start_time))
 
-bf_start_time = timer()
-[bf_left, bf_right, bf_sum] = bruteforcemaximumsubarray(A);
-bf_end_time = timer()
-print("Brute-force time = ", timedelta(seconds=bf_end_time-bf_start_time))
+    kadane_start_time = timer()
+    [kadane_left, kadane_right, kadane_sum] = kadanemaximumsubarray(A);
+    kadane_end_time = timer()
+    print("Kadane time = ", timedelta(seconds=kadane_end_time-kadane_start_time))
 
-kadane_start_time = timer()
-[kadane_left, kadane_right, kadane_sum] = kadanemaximumsubarray(A);
-kadane_end_time = timer()
-print("Kadane time = ", timedelta(seconds=kadane_end_time-kadane_start_time))
+    print("Maximum subarray sum = ", sum, " from " , left, " to ", right)
+    print("Maximum brute force subarray sum = ", bf_sum, " from " , bf_left, " to ", bf_right)
+    print("Maximum kadane subarray sum = ", kadane_sum, " from " , kadane_left, " to ", kadane_right)
 
-print("Maximum subarray sum = ", sum, " from " , left, " to ", right)
-print("Maximum brute force subarray sum = ", bf_sum, " from " , bf_left, " to ", bf_right)
-print("Maximum kadane subarray sum = ", kadane_sum, " from " , kadane_left, " to ", kadane_right)
+    #batched version over many series at once (one series per row)
+    num_series = 1000
+    B = np.random.randint(-10,10,[num_series,n])
 
+    kadane_start_time = timer()
+    for i in range(0, num_series):
+        kadanemaximumsubarray(B[i])
+    kadane_end_time = timer()
+    time_kadane = timedelta(seconds=kadane_end_time-kadane_start_time)
+    print("Kadane time for ", num_series, " series = ", time_kadane)
 
+    batched_start_time = timer()
+    [batched_left, batched_right, batched_sum] = batchedmaximumsubarray(B)
+    batched_end_time = timer()
+    time_batched = timedelta(seconds=batched_end_time-batched_start_time)
+    print("Batched time for ", num_series, " series = ", time_batched)
+    print("Batched Speedup = ", time_kadane/time_batched)
+    print("Maximum batched subarray sum of first series = ", batched_sum[0], " from " , batched_left[0], " to ", batched_right[0])
 
+    #streaming version, walking a series in chunks as if it were memory-mapped from disk
+    streaming_start_time = timer()
+    [streaming_left, streaming_right, streaming_sum] = streamingmaximumsubarray(A, chunksize=64)
+    streaming_end_time = timer()
+    print("Streaming time = ", timedelta(seconds=streaming_end_time-streaming_start_time))
+    print("Maximum streaming subarray sum = ", streaming_sum, " from " , streaming_left, " to ", streaming_right)
 
+    #segment tree for repeated range queries on slowly changing data
+    tree_start_time = timer()
+    tree = MaximumSubarrayTree(A)
+    tree_end_time = timer()
+    print("Segment tree build time = ", timedelta(seconds=tree_end_time-tree_start_time))
 
+    low = n//4
+    high = 3*n//4
+    tree_start_time = timer()
+    [tree_left, tree_right, tree_sum] = tree.query(low, high)
+    tree_end_time = timer()
+    print("Segment tree query time = ", timedelta(seconds=tree_end_time-tree_start_time))
+    print("Maximum segment tree subarray sum from ", low, " to ", high, " = ", tree_sum, " from " , tree_left, " to ", tree_right)
 
+    A[n//2] = 100
+    tree.update(n//2, A[n//2])
+    [tree_left, tree_right, tree_sum] = tree.query(low, high)
+    print("After setting A[", n//2, "] = 100, maximum segment tree subarray sum = ", tree_sum, " from " , tree_left, " to ", tree_right)
 
+    #2-D version on a heatmap
+    G = np.random.randint(-10,10,[n,n//2])
+    rectangle_start_time = timer()
+    [top, left, bottom, right, rectangle_sum] = maximumsubrectangle(G)
+    rectangle_end_time = timer()
+    print("Sub-rectangle time = ", timedelta(seconds=rectangle_end_time-rectangle_start_time))
+    print("Maximum sub-rectangle sum = ", rectangle_sum, " from (", top, ",", left, ") to (", bottom, ",", right, ")")
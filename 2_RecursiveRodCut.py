@@ -1,6 +1,7 @@
 import numpy as np
 import sys
 import math
+import concurrent.futures
 from timeit import default_timer as timer
 from datetime import timedelta
 
@@ -18,53 +19,101 @@ def recursiverodcut(p,n):
         r = max(r, p[i-1] + recursiverodcut(p, n-i)) #zero based access for price p
     return r
 
-def directrodcut(p,n):
-    """Directly optimize the revenue on selling a rod of length n with length prices p.
+def cutsrevenue(p, n, mask):
+    """Revenue of cutting a rod of length n at the positions set in mask (bit b = cut after piece b+1).
 
+    Also returns the list of piece lengths.
     """
-    
-    r = float('-Inf');  #maximum revenue
+    pieces = []
+    value = 0
+    piece_size = 1
+    for b in range(0, n-1):
+        if (mask >> b) & 1:         #if we encounter a cut
+            pieces.append(piece_size)
+            value += p[piece_size-1]
+            piece_size = 1
+        else:
+            piece_size += 1
+    pieces.append(piece_size)
+    value += p[piece_size-1]        #add value of last piece
+    return value, pieces
+
+def graycoderodcut(p, n, prefix=0, lowbits=None):
+    """Exhaustively search the cut sets whose cuts above the lowest lowbits positions are given by prefix.
+
+    The low cut positions are enumerated in Gray-code order, so consecutive cut sets
+    differ in a single cut. Adding or removing the cut at position c only changes the
+    piece between the nearest cuts L < c < R, so the revenue is updated in O(1):
+    p[R-L] is swapped for p[c-L] + p[R-c] (or back). Returns the best revenue and mask.
+    """
+    if lowbits is None:
+        lowbits = n-1
+    p = [x.item() if hasattr(x, 'item') else x for x in p]    #plain Python numbers index fastest
+    mask = prefix << lowbits
+    value, pieces = cutsrevenue(p, n, mask)
+    best = value
+    bestmask = mask
+
+    for i in range(1, 1 << lowbits):
+        b = (i & -i).bit_length() - 1       #Gray code: toggle the lowest set bit of the counter
+        bit = 1 << b
+        left = (mask & (bit - 1)).bit_length()  #position of the nearest cut to the left (0 = rod end)
+        upper = mask >> (b + 1)
+        right = b + 1 + (upper & -upper).bit_length() if upper else n  #nearest cut to the right
+        split = p[b - left] + p[right - b - 2]  #pieces of length c-L and R-c with c = b+1
+        merged = p[right - left - 1]
+        if mask & bit:
+            value += merged - split
+        else:
+            value += split - merged
+        mask ^= bit
+        if value > best:
+            best = value
+            bestmask = mask
+
+    return best, bestmask
+
+def _graycodeshard(args):
+    """Process pool worker for directrodcut."""
+    return graycoderodcut(*args)
+
+def directrodcut(p, n, workers=None):
+    """Directly optimize the revenue on selling a rod of length n with length prices p.
 
-    for i in range(0, 2**(n-1)): #for every possible set of cuts
-        
-        bitstring = bin(i)[2:].zfill(n-1) #determine cut bitstring
+    Checks every one of the 2^(n-1) sets of cuts (see graycoderodcut). With workers > 1
+    the sets are sharded across a process pool by fixing the highest cut positions.
+    Returns the maximum revenue and the list of piece lengths achieving it.
+    """
+    if workers is None or workers <= 1 or n < 8:
+        best, bestmask = graycoderodcut(p, n)
+    else:
+        highbits = min(n-1, max(1, (4*workers - 1).bit_length()))   #at least 4 shards per worker
+        lowbits = n - 1 - highbits
+        shards = [(p, n, prefix, lowbits) for prefix in range(0, 1 << highbits)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_graycodeshard, shards))
+        best, bestmask = max(results, key=lambda result: result[0])
 
-        value = 0.0         #value of current set of cuts
-        piece_size = 1      #current piece size
-        
-        for j in range(0,n-1): #loop over the cut bitstring
-            if int(bitstring[j]) == 1: #if we encounter a cut
-                value += p[piece_size-1] #add value of current piece (note price list doesn't include size 0)
-                piece_size = 1 #reset piece size for next piece
-            else:
-                piece_size += 1 #extend piece size
-        value += p[piece_size - 1] #add value of last piece
-        r = max(r,value)
+    r, pieces = cutsrevenue(p, n, bestmask)
+    return r, pieces
 
 
 #main entry point
-n = 18 #this starts to take a lot of time quickly - go from here and increase cautiously.
-p = np.random.randint(1,n,n)
-
-print("Rod-cutting problem with n = ", n)
-print("Price list = ", p)
-
-start_time = timer()
-rrecursive = recursiverodcut(p, n)
-end_time = timer();
-print("Divide-and-conquer time = ", timedelta(seconds=end_time-start_time))
-print("Divide-and-conquer max revenue = ", rrecursive)
-
-start_time = timer()
-rdirect = directrodcut(p,n)
-end_time = timer()
-print("Direct time = ", timedelta(seconds=end_time-start_time))
-print("Direct max revenue = ", rrecursive)
-
-
-
-
-
-
-
-
+if __name__ == "__main__":
+    n = 18 #this starts to take a lot of time quickly - go from here and increase cautiously.
+    p = np.random.randint(1,n,n)
+
+    print("Rod-cutting problem with n = ", n)
+    print("Price list = ", p)
+
+    start_time = timer()
+    rrecursive = recursiverodcut(p, n)
+    end_time = timer();
+    print("Divide-and-conquer time = ", timedelta(seconds=end_time-start_time))
+    print("Divide-and-conquer max revenue = ", rrecursive)
+
+    start_time = timer()
+    rdirect, direct_pieces = directrodcut(p,n)
+    end_time = timer()
+    print("Direct time = ", timedelta(seconds=end_time-start_time))
+    print("Direct max revenue = ", rdirect, " using cut lengths ", direct_pieces)
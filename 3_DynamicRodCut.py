@@ -1,6 +1,9 @@
 import numpy as np
 import sys
 import math
+import hashlib
+import collections
+from memoization import Memo
 from timeit import default_timer as timer
 from datetime import timedelta
 
@@ -20,26 +23,23 @@ def memoizedrodcut(p,n):
     """Wrapper function for memoized recursive rod cut (dymanic programming approach)
         
         """
-    rvec = np.zeros(n+1)            #memos (list of values to be kept)
-    rvec[0:n+1] = -float('Inf')     #initialize to "not calculated"
-    r = memoizedrecursiverodcut(p,n,rvec)
+    memo = Memo(key=lambda p, n: n)     #memos (values to be kept) for this price list, keyed by length
+    r = memo(memoizedrecursiverodcut)(p,n)
     return r
 
 
-def memoizedrecursiverodcut(p,n,rvec):
+def memoizedrecursiverodcut(p,n):
     """Recursively optimize the revenue on selling a rod of length n with length prices p.
-        
+
+    Each yield is a recursive call made through the memo (see memoizedrodcut), which
+    also keeps the calls on an explicit stack so n is not limited by the recursion limit.
         """
-    if rvec[n] >= 0.0:              #if the memo exists, just return it
-        return rvec[n]
-    
     if n == 0:                      #the rest is like our recursive function in Lecture 13
-        r = 0
-    else:
-        r = float('-Inf')
-        for i in range(1,n+1): #cut at location 1 up to location n (note location n = no cut)
-            r = max(r, p[i-1] + memoizedrecursiverodcut(p, n-i, rvec)) #zero based access for price p
-        rvec[n] = r; #keep the record (write the memo)
+        return 0
+
+    r = float('-Inf')
+    for i in range(1,n+1): #cut at location 1 up to location n (note location n = no cut)
+        r = max(r, p[i-1] + (yield p, n-i)) #zero based access for price p
     return r
 
 def bottomuprodcut(p,n):
@@ -47,7 +47,7 @@ def bottomuprodcut(p,n):
         
         """    
     rvec = np.zeros(n+1)    #record of values
-    svec = np.zeros(n+1)    #best cuts for each length
+    svec = np.zeros(n+1, dtype=int)    #best cuts for each length
     rvec[0] = 0 #a zero-size piece gets 0 revenue
     
     
@@ -61,6 +61,101 @@ def bottomuprodcut(p,n):
         rvec[j] = r #keep the record (write the memo)
     return rvec[n], svec
 
+def batchedbottomuprodcut(P, n):
+    """Solve the rod cutting problem bottom up for many price lists at once.
+
+    P is a k x n matrix with one price list per row. Returns the k x (n+1) matrix of
+    optimal revenues for every length 0..n and the k x (n+1) integer matrix of best
+    first cuts, so rvec[i,n], svec[i] is the solution bottomuprodcut(P[i],n) returns.
+    """
+    P = np.atleast_2d(P)
+    k = len(P)
+    pT = np.ascontiguousarray(P[:, 0:n].T)                      #n x k, one row per cut length
+    rvec = np.zeros((n+1, k), dtype=np.result_type(P.dtype, np.int64))   #record of values
+    svec = np.zeros((n+1, k), dtype=int)                        #best cuts for each length
+    columns = np.arange(k)
+
+    for j in range(1, n+1):
+        #revenue of cutting length i = 1..j first, for every price list at once
+        candidates = pT[0:j] + rvec[j-1::-1]
+        best = np.argmax(candidates, axis=0)     #first maximum, as in bottomuprodcut
+        rvec[j] = candidates[best, columns]
+        svec[j] = best + 1
+    return rvec.T, svec.T
+
+class RodCutCache:
+    """Persistent cache of bottom-up rod cutting tables, one per price list.
+
+    Entries are keyed by a hash of the price vector and hold the rvec/svec tables
+    solved so far. A request for a longer rod extends the tables from the largest
+    solved length only, and a request for a length already solved is a lookup.
+    Least recently used entries are evicted once the tables exceed max_bytes.
+    """
+
+    def __init__(self, max_bytes=64*1024*1024):
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()    #key -> [rvec, svec, largest solved length]
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        return str("Rod cut cache") + str({'entries': len(self.entries), 'nbytes': self.nbytes, 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions})
+    def __str__(self):
+        return self.__repr__()
+
+    @staticmethod
+    def key(p):
+        """Hash of the price vector (dtype and contents)."""
+        p = np.ascontiguousarray(p)
+        return hashlib.blake2b(p.dtype.str.encode() + p.tobytes(), digest_size=16).digest()
+
+    def solve(self, p, n):
+        """Return the max revenue for a rod of length n with prices p, and the best cuts svec[0..n]."""
+        assert(n <= len(p))
+        key = self.key(p)
+        entry = self.entries.get(key)
+        if entry is not None and entry[2] >= n:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[0][n], entry[1][0:n+1]
+
+        self.misses += 1
+        if entry is None:
+            entry = [np.zeros(n+1, dtype=np.result_type(np.asarray(p).dtype, float)), np.zeros(n+1, dtype=int), 0]
+            self.entries[key] = entry
+            self.nbytes += entry[0].nbytes + entry[1].nbytes
+        else:
+            self.entries.move_to_end(key)
+
+        rvec, svec, solved = entry
+        if len(rvec) < n+1:   #grow geometrically so repeated extensions stay cheap
+            size = min(max(n+1, 2*len(rvec)), len(p)+1)
+            self.nbytes -= rvec.nbytes + svec.nbytes
+            rvec = np.concatenate((rvec, np.zeros(size - len(rvec), dtype=rvec.dtype)))
+            svec = np.concatenate((svec, np.zeros(size - len(svec), dtype=svec.dtype)))
+            self.nbytes += rvec.nbytes + svec.nbytes
+
+        for j in range(solved+1, n+1):  #extend from the largest solved length only
+            candidates = p[0:j] + rvec[j-1::-1]
+            i = int(np.argmax(candidates))
+            rvec[j] = candidates[i]
+            svec[j] = i + 1
+        entry[0], entry[1], entry[2] = rvec, svec, n
+
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            oldkey, old = self.entries.popitem(last=False)
+            self.nbytes -= old[0].nbytes + old[1].nbytes
+            self.evictions += 1
+
+        return rvec[n], svec[0:n+1]
+
+    def clear(self):
+        """Drop every cached table (the counters are kept)."""
+        self.entries.clear()
+        self.nbytes = 0
+
 def printrodcutsolution(p,n,r,svec):
     """Display the solution to the rod cutting problem
                     
@@ -72,7 +167,7 @@ def printrodcutsolution(p,n,r,svec):
     cutcount = 0
     while n_remaining > 0: #while we still have length left
         cutcount += 1
-        cutsize = int(np.floor(svec[n_remaining]))  #the best length to cut off is stored in svec
+        cutsize = int(svec[n_remaining])            #the best length to cut off is stored in svec
         cutvalue = p[cutsize - 1]                   #p excludes 0
         print("\tCut # ", cutcount, ": length = ", cutsize, " value = ", cutvalue)  #display the cut
         n_remaining = n_remaining - cutsize         #we've cut off cutsize so we are left with this
@@ -80,42 +175,70 @@ def printrodcutsolution(p,n,r,svec):
     print("Sum of cut values = ", r_from_cuts)
 
 #main entry point
-n = 15
-p = np.random.randint(1,n,n)
-
-print("\n\nRod-cutting problem with n = ", n)
-print("Price list = ", p, "\n")
-
-#recursive version
-start_time = timer()
-rrecursive = recursiverodcut(p, n)
-end_time = timer();
-time_recursive = timedelta(seconds=end_time-start_time)
-print("Divide-and-conquer time = ", time_recursive)
-print("Divide-and-conquer max revenue = ", rrecursive, "\n")
-
-#memoized version
-start_time = timer()
-rmemoized = memoizedrodcut(p,n)
-end_time = timer()
-time_memoized = timedelta(seconds=end_time-start_time)
-print("Memoized time = ", time_memoized)
-print("Memoized max revenue = ", rmemoized)
-print("Memoization Speedup = ", time_recursive/time_memoized, "\n")
-
-#bottom-up version
-start_time = timer()
-rbottomup, svec = bottomuprodcut(p,n)
-end_time = timer()
-time_bottomup = timedelta(seconds=end_time-start_time)
-print("Bottom-up time = ", time_bottomup)
-print("Bottom-up max revenue = ", rbottomup)
-print("Bottom-up vs Memoization Speedup = ", time_memoized/time_bottomup, "\n")
-
-#display the solution
-printrodcutsolution(p, n, rbottomup, svec)
-                
-
-
-
-
+if __name__ == "__main__":
+    n = 15
+    p = np.random.randint(1,n,n)
+
+    print("\n\nRod-cutting problem with n = ", n)
+    print("Price list = ", p, "\n")
+
+    #recursive version
+    start_time = timer()
+    rrecursive = recursiverodcut(p, n)
+    end_time = timer();
+    time_recursive = timedelta(seconds=end_time-start_time)
+    print("Divide-and-conquer time = ", time_recursive)
+    print("Divide-and-conquer max revenue = ", rrecursive, "\n")
+
+    #memoized version
+    start_time = timer()
+    rmemoized = memoizedrodcut(p,n)
+    end_time = timer()
+    time_memoized = timedelta(seconds=end_time-start_time)
+    print("Memoized time = ", time_memoized)
+    print("Memoized max revenue = ", rmemoized)
+    print("Memoization Speedup = ", time_recursive/time_memoized, "\n")
+
+    #bottom-up version
+    start_time = timer()
+    rbottomup, svec = bottomuprodcut(p,n)
+    end_time = timer()
+    time_bottomup = timedelta(seconds=end_time-start_time)
+    print("Bottom-up time = ", time_bottomup)
+    print("Bottom-up max revenue = ", rbottomup)
+    print("Bottom-up vs Memoization Speedup = ", time_memoized/time_bottomup, "\n")
+
+    #display the solution
+    printrodcutsolution(p, n, rbottomup, svec)
+
+    #batched version over many price lists
+    num_price_lists = 200
+    P = np.random.randint(1,n,[num_price_lists,n])
+    P[0] = p
+
+    start_time = timer()
+    for i in range(0, num_price_lists):
+        bottomuprodcut(P[i],n)
+    end_time = timer()
+    time_bottomup = timedelta(seconds=end_time-start_time)
+    print("\nBottom-up time for ", num_price_lists, " price lists = ", time_bottomup)
+
+    start_time = timer()
+    rbatched, sbatched = batchedbottomuprodcut(P,n)
+    end_time = timer()
+    time_batched = timedelta(seconds=end_time-start_time)
+    print("Batched time for ", num_price_lists, " price lists = ", time_batched)
+    print("Batched vs Bottom-up Speedup = ", time_bottomup/time_batched)
+    print("Batched max revenue for the first price list = ", rbatched[0,n], "\n")
+
+    #cached version, repeated quotes against the same price list
+    cache = RodCutCache()
+    start_time = timer()
+    rcached, scached = cache.solve(p,n)
+    end_time = timer()
+    print("Cached time (first quote) = ", timedelta(seconds=end_time-start_time))
+    start_time = timer()
+    rcached, scached = cache.solve(p,n-1)
+    end_time = timer()
+    print("Cached time (repeat quote, shorter rod) = ", timedelta(seconds=end_time-start_time))
+    print("Cached max revenue for n - 1 = ", rcached, " ", cache)
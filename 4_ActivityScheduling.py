@@ -2,22 +2,62 @@ import numpy as np
 import sys
 import math
 import operator #for sorting lists of classes by attribute
+import bisect
+import random
+import heapq
 from timeit import default_timer as timer
 from datetime import timedelta
 
 class SimpleActivity:
     """A simple activity class"""
-    start_time = -1
-    finish_time = -1
+    __slots__ = ('start_time', 'finish_time')   #no per-instance __dict__
 
     def __init__(self, start, finish):
         self.start_time = start;
         self.finish_time = finish;
 
     def __repr__(self):
-        return str("Activity instance") + str(self.__dict__)
+        return str("Activity instance") + str({'start_time': self.start_time, 'finish_time': self.finish_time})
     def __str__(self):
-        return str("Activity instance") + str(self.__dict__)
+        return self.__repr__()
+
+
+class ActivitySet:
+    """A columnar set of activities: parallel NumPy arrays of start and finish times.
+
+    Uses a few bytes per activity instead of one SimpleActivity object each. An
+    optional array of weights (e.g. revenue) is used by WeightedIntervalSchedule.
+    """
+
+    def __init__(self, start_times, finish_times, dtype=None, weights=None):
+        self.start_times = np.ascontiguousarray(start_times, dtype=dtype)
+        self.finish_times = np.ascontiguousarray(finish_times, dtype=dtype if dtype is not None else self.start_times.dtype)
+        assert(self.start_times.shape == self.finish_times.shape)
+        self.weights = None
+        if weights is not None:
+            self.weights = np.ascontiguousarray(weights)
+            assert(self.weights.shape == self.start_times.shape)
+
+    @classmethod
+    def fromactivities(cls, activities, dtype=None, weights=None):
+        """Build from a list of SimpleActivity."""
+        return cls([a.start_time for a in activities], [a.finish_time for a in activities], dtype, weights)
+
+    def __len__(self):
+        return len(self.start_times)
+
+    def activity(self, i):
+        """Activity i as a SimpleActivity."""
+        return SimpleActivity(self.start_times[i], self.finish_times[i])
+
+    def finishorder(self):
+        """Indexes of the activities sorted by finish time (stable, like list.sort)."""
+        return np.argsort(self.finish_times, kind='stable')
+
+    def __repr__(self):
+        return str("Activity set of ") + str(len(self)) + str(" activities")
+    def __str__(self):
+        return self.__repr__()
 
 
 def RecursiveGreedySchedule(activities, k, n, schedule):
@@ -37,7 +77,13 @@ def RecursiveGreedySchedule(activities, k, n, schedule):
         RecursiveGreedySchedule(activities, m, n, schedule)
 
 def IterativeGreedySchedule(activities):
-    """Greedy Schedule Iteratively"""
+    """Greedy Schedule Iteratively
+
+    For an ActivitySet the (unsorted) arrays are scheduled with VectorizedGreedySchedule
+    and the indexes of the chosen activities are returned.
+    """
+    if isinstance(activities, ActivitySet):
+        return VectorizedGreedySchedule(activities)
 
     n = len(activities)
     schedule = [];
@@ -52,44 +98,430 @@ def IterativeGreedySchedule(activities):
 
     return schedule
 
+def VectorizedGreedySchedule(activities, order=None):
+    """Greedy Schedule over the arrays of an ActivitySet
+
+    Sorts by finish time with argsort (or uses a precomputed order) and returns the
+    indexes of the scheduled activities, in schedule order. The same activities as
+    IterativeGreedySchedule on the sorted list are chosen. With activities sorted by
+    finish time, the next activity after k is the first one whose start time reaches
+    the finish time of k. That is found for every k at once by binary search on the
+    running maximum of the start times, and only the scheduled activities are then
+    visited in Python.
+    """
+    n = len(activities)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    if order is None:
+        order = activities.finishorder()
+    finish_times = activities.finish_times[order]
+    start_times = activities.start_times[order]
+    latest_start = np.maximum.accumulate(start_times)
+    next_activity = np.searchsorted(latest_start, finish_times, side='left')
+    del latest_start
+
+    schedule = [0]
+    k = 0
+    while True:
+        m = int(next_activity[k])
+        if m <= k:
+            #only zero-length activities finishing with k can start at or before k, so search
+            #forward from k+1 in doubling windows (the cost is proportional to how far k moves)
+            m = n
+            low = k + 1
+            window = 16
+            while low < n:
+                later = np.flatnonzero(start_times[low:low+window] >= finish_times[k])
+                if len(later) > 0:
+                    m = low + int(later[0])
+                    break
+                low += window
+                window *= 2
+        if m >= n:
+            break
+        schedule.append(m)
+        k = m
+
+    return order[np.array(schedule)]
+
+def WeightedIntervalSchedule(activities, weights=None, order=None):
+    """Weighted Schedule: compatible activities of maximum total weight
+
+    Dynamic programming over the activities of an ActivitySet sorted by finish time
+    (as for the greedy schedules). The latest compatible predecessor of every
+    activity is found by binary search on the sorted finish times, then
+        best[j+1] = max(best[j], weight[j] + best[latest compatible before j])
+    is an O(n) pass. Returns the maximum total weight and the indexes of the chosen
+    activities, in schedule order. weights defaults to activities.weights.
+    """
+    if weights is None:
+        weights = activities.weights
+    n = len(activities)
+    if n == 0:
+        return 0, np.zeros(0, dtype=np.int64)
+    if order is None:
+        #by finish time, then start time so zero-length activities follow the ones they can follow
+        order = np.lexsort((activities.start_times, activities.finish_times))
+    finish_times = activities.finish_times[order]
+
+    #number of activities finishing by the time activity j starts, i.e. its compatible predecessors
+    predecessors = np.searchsorted(finish_times, activities.start_times[order], side='right')
+    np.minimum(predecessors, np.arange(n), out=predecessors)   #zero-length activities finish when they start
+    predecessors = predecessors.tolist()
+    sorted_weights = np.asarray(weights)[order].tolist()
+
+    best = [0]*(n+1)
+    take = bytearray(n)     #decision for each activity, for reconstruction
+    for j in range(0, n):
+        with_j = sorted_weights[j] + best[predecessors[j]]
+        if with_j > best[j]:
+            best[j+1] = with_j
+            take[j] = 1
+        else:
+            best[j+1] = best[j]
+
+    schedule = []
+    j = n
+    while j > 0:
+        if take[j-1]:
+            schedule.append(j-1)
+            j = predecessors[j-1]
+        else:
+            j -= 1
+    schedule.reverse()
+
+    return best[n], order[np.array(schedule, dtype=np.int64)]
+
+
+class IntervalTreeNode:
+    """Node of the treap used by IntervalTree.
+
+    Besides the activity it keeps, for its subtree, the maximum finish time (for
+    overlap queries) and the (finish time, id) of the earliest finishing activity
+    (for the greedy schedule).
+    """
+    __slots__ = ('start_time', 'finish_time', 'id', 'priority', 'left', 'right', 'max_finish', 'min_finish')
+
+    def __init__(self, start, finish, id):
+        self.start_time = start
+        self.finish_time = finish
+        self.id = id
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.max_finish = finish
+        self.min_finish = (finish, id)
+
+    def key(self):
+        return (self.start_time, self.finish_time, self.id)
+
+    def update(self):
+        self.max_finish = self.finish_time
+        self.min_finish = (self.finish_time, self.id)
+        for child in (self.left, self.right):
+            if child is not None:
+                if child.max_finish > self.max_finish:
+                    self.max_finish = child.max_finish
+                if child.min_finish < self.min_finish:
+                    self.min_finish = child.min_finish
+
+class IntervalTree:
+    """Interval tree (a treap ordered by start time, augmented as in IntervalTreeNode).
+
+    Insert, delete and both queries take O(log n) expected time.
+    """
+
+    def __init__(self):
+        self.root = None
+
+    @staticmethod
+    def _rotateright(node):
+        left = node.left
+        node.left = left.right
+        left.right = node
+        node.update()
+        left.update()
+        return left
+
+    @staticmethod
+    def _rotateleft(node):
+        right = node.right
+        node.right = right.left
+        right.left = node
+        node.update()
+        right.update()
+        return right
+
+    def _insert(self, node, new):
+        if node is None:
+            return new
+        if new.key() < node.key():
+            node.left = self._insert(node.left, new)
+            if node.left.priority > node.priority:
+                return self._rotateright(node)
+        else:
+            node.right = self._insert(node.right, new)
+            if node.right.priority > node.priority:
+                return self._rotateleft(node)
+        node.update()
+        return node
+
+    def _delete(self, node, key):
+        if node is None:
+            return None
+        if key < node.key():
+            node.left = self._delete(node.left, key)
+        elif key > node.key():
+            node.right = self._delete(node.right, key)
+        else:
+            if node.left is None:
+                return node.right
+            if node.right is None:
+                return node.left
+            if node.left.priority > node.right.priority:    #rotate the node down and delete it there
+                node = self._rotateright(node)
+                node.right = self._delete(node.right, key)
+            else:
+                node = self._rotateleft(node)
+                node.left = self._delete(node.left, key)
+        node.update()
+        return node
+
+    def insert(self, node):
+        self.root = self._insert(self.root, node)
+
+    def delete(self, node):
+        self.root = self._delete(self.root, node.key())
+
+    def overlaps(self, start, finish):
+        """True if some interval [s,f) in the tree overlaps [start,finish), i.e. s < finish and f > start."""
+        node = self.root
+        while node is not None:
+            if node.start_time < finish:
+                if node.left is not None and node.left.max_finish > start:
+                    return True     #every interval on the left starts before finish too
+                if node.finish_time > start:
+                    return True
+                node = node.right
+            else:
+                node = node.left
+        return False
+
+    def earliestfinishafter(self, t):
+        """(finish time, id) of the earliest finishing interval starting at or after t, or None."""
+        best = None
+        node = self.root
+        while node is not None:
+            if node.start_time >= t:
+                #this node and its whole right subtree start at or after t
+                own = (node.finish_time, node.id)
+                if best is None or own < best:
+                    best = own
+                if node.right is not None and node.right.min_finish < best:
+                    best = node.right.min_finish
+                node = node.left
+            else:
+                node = node.right
+        return best
+
+class OnlineScheduler:
+    """Greedy activity schedule maintained online as activities are added and cancelled.
+
+    The activities are kept in an IntervalTree. The greedy schedule (the one
+    IterativeGreedySchedule produces, ties in finish time broken by insertion order)
+    is kept as a list sorted by finish time. The activity after a scheduled one is the
+    earliest finishing activity starting after it finishes, so a change only
+    recomputes the schedule from the first position it affects until the new chain
+    reaches an activity already in the old schedule, from which point they agree.
+    Activities must finish after they start.
+    """
+
+    def __init__(self):
+        self.tree = IntervalTree()
+        self.nodes = {}             #id -> IntervalTreeNode
+        self.schedule_keys = []     #(finish time, id) of the scheduled activities, in order
+        self.scheduled = set()      #ids of the scheduled activities
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def activity(self, id):
+        node = self.nodes[id]
+        return SimpleActivity(node.start_time, node.finish_time)
+
+    def isfree(self, start, finish):
+        """True if no activity overlaps the slot [start,finish)."""
+        return not self.tree.overlaps(start, finish)
+
+    def schedule(self):
+        """Ids of the activities in the current greedy schedule, in order."""
+        return [key[1] for key in self.schedule_keys]
+
+    def _rebuild(self, position, first):
+        """Replace the schedule from position onwards with the chain starting at first."""
+        chain = []
+        current = first
+        while current is not None and current[1] not in self.scheduled:
+            chain.append(current)
+            current = self.tree.earliestfinishafter(current[0])
+        end = len(self.schedule_keys) if current is None else bisect.bisect_left(self.schedule_keys, current)
+        for key in self.schedule_keys[position:end]:
+            self.scheduled.discard(key[1])
+        self.schedule_keys[position:end] = chain
+        for key in chain:
+            self.scheduled.add(key[1])
+
+    def insert(self, start, finish):
+        """Add the activity [start,finish) and return its id."""
+        assert(finish > start)
+        id = self.next_id
+        self.next_id += 1
+        node = IntervalTreeNode(start, finish, id)
+        self.nodes[id] = node
+        self.tree.insert(node)
+
+        #only the first scheduled activity finishing after start can be displaced by this one
+        position = bisect.bisect_right(self.schedule_keys, (start, float('Inf')))
+        key = (finish, id)
+        if position == len(self.schedule_keys) or key < self.schedule_keys[position]:
+            self._rebuild(position, key)
+        return id
+
+    def delete(self, id):
+        """Cancel the activity with the given id."""
+        node = self.nodes.pop(id)
+        self.tree.delete(node)
+        if id in self.scheduled:
+            key = (node.finish_time, id)
+            position = bisect.bisect_left(self.schedule_keys, key)
+            self.scheduled.discard(id)
+            del self.schedule_keys[position]
+            t = self.schedule_keys[position-1][0] if position > 0 else -float('Inf')
+            self._rebuild(position, self.tree.earliestfinishafter(t))
+
+
+def _orderedintervals(activities, order, chunksize=1<<16):
+    """(start, finish) pairs of an ActivitySet in the given order, converted to Python numbers a chunk at a time."""
+    for low in range(0, len(order), chunksize):
+        chunk = order[low:low+chunksize]
+        yield from zip(activities.start_times[chunk].tolist(), activities.finish_times[chunk].tolist())
+
+def IntervalPartition(activities):
+    """Assign every activity to a room so that activities in a room do not overlap, using the fewest rooms
+
+    activities is an ActivitySet or any iterable of (start, finish) pairs or
+    SimpleActivity in start time order (so very large inputs can be streamed, e.g.
+    from a sorted file). Sweeping in start time order, an activity goes into the room
+    that frees up earliest if it is free by then (min-heap of room finish times),
+    otherwise into a new room. Returns the room index of every activity (in the
+    order of the input) and the peak number of concurrent activities, which equals
+    the number of rooms used.
+    """
+    if isinstance(activities, ActivitySet):
+        order = np.argsort(activities.start_times, kind='stable')
+        rooms = np.zeros(len(activities), dtype=np.int64)
+        rooms[order], peak = IntervalPartition(_orderedintervals(activities, order))
+        return rooms, peak
+
+    rooms = []
+    busy = []           #heap of (finish time, room) for the rooms in use
+    room_count = 0
+    last_start = -float('Inf')
+    for activity in activities:
+        if isinstance(activity, SimpleActivity):
+            start, finish = activity.start_time, activity.finish_time
+        else:
+            start, finish = activity
+        assert(start >= last_start)     #input must be in start time order
+        last_start = start
+
+        if busy and busy[0][0] <= start:
+            room = busy[0][1]
+            heapq.heapreplace(busy, (finish, room))  #reuse the room that frees up earliest
+        else:
+            room = room_count
+            room_count += 1
+            heapq.heappush(busy, (finish, room))
+        rooms.append(room)
+
+    return np.array(rooms, dtype=np.int64), room_count
+
 
 #main point of entry
-num_activities = 150
-activity_set = [];
-activity_set.append(SimpleActivity(0,0)) #ficticious activity so we can start looking after a0
-
-#create a liist of random activities
-for i in range(0,num_activities):
-
-    activity_start_time = np.random.randint(0,60,1)
-    activity_stop_time = np.random.randint(activity_start_time + 1, 61, 1) #stop time must happen after start time
-    activity_set.append(SimpleActivity(activity_start_time[0], activity_stop_time[0]))
-
-#sort the list by finish time
-activity_set.sort(key=operator.attrgetter('finish_time'))
-
-#display the list of activities
-for i in activity_set:
-    print(i)
-
-#run and time the recursive schedule
-start_time = timer()
-recursive_schedule = [];    #start with a blank schedule
-RecursiveGreedySchedule(activity_set, 0, num_activities, recursive_schedule)
-end_time = timer();
-time_recursive = timedelta(seconds=end_time-start_time)
-print("Recursive Schedule time = ", time_recursive)
-del activity_set[0] #delete that ficticious activity (it isn't needed in the recursive case)
-
-#run and time the iterative schedule
-start_time = timer()
-iterative_schedule = IterativeGreedySchedule(activity_set)
-end_time = timer();
-time_iterative = timedelta(seconds=end_time-start_time)
-print("Iterative Schedule time = ", time_iterative)
-
-#display the solutions (recursive left, iterative right)
-#some weird indexing here
-for i in range(0, len(iterative_schedule)):
-    print("Recursive Event Scheduled: \t", recursive_schedule[i], " --- Iterative Event Scheduled: ", iterative_schedule[i])
+if __name__ == "__main__":
+    num_activities = 150
+    activity_set = [];
+    activity_set.append(SimpleActivity(0,0)) #ficticious activity so we can start looking after a0
+
+    #create a liist of random activities
+    for i in range(0,num_activities):
+
+        activity_start_time = np.random.randint(0,60,1)
+        activity_stop_time = np.random.randint(activity_start_time + 1, 61, 1) #stop time must happen after start time
+        activity_set.append(SimpleActivity(activity_start_time[0], activity_stop_time[0]))
+
+    #sort the list by finish time
+    activity_set.sort(key=operator.attrgetter('finish_time'))
+
+    #display the list of activities
+    for i in activity_set:
+        print(i)
+
+    #run and time the recursive schedule
+    start_time = timer()
+    recursive_schedule = [];    #start with a blank schedule
+    RecursiveGreedySchedule(activity_set, 0, num_activities, recursive_schedule)
+    end_time = timer();
+    time_recursive = timedelta(seconds=end_time-start_time)
+    print("Recursive Schedule time = ", time_recursive)
+    del activity_set[0] #delete that ficticious activity (it isn't needed in the recursive case)
+
+    #run and time the iterative schedule
+    start_time = timer()
+    iterative_schedule = IterativeGreedySchedule(activity_set)
+    end_time = timer();
+    time_iterative = timedelta(seconds=end_time-start_time)
+    print("Iterative Schedule time = ", time_iterative)
+
+    #display the solutions (recursive left, iterative right)
+    #some weird indexing here
+    for i in range(0, len(iterative_schedule)):
+        print("Recursive Event Scheduled: \t", recursive_schedule[i], " --- Iterative Event Scheduled: ", iterative_schedule[i])
+
+    #run and time the vectorized schedule on a columnar copy of the activities
+    columnar_set = ActivitySet.fromactivities(activity_set, dtype=np.int32)
+    start_time = timer()
+    vectorized_schedule = IterativeGreedySchedule(columnar_set)
+    end_time = timer();
+    time_vectorized = timedelta(seconds=end_time-start_time)
+    print("Vectorized Schedule time = ", time_vectorized)
+    print("Vectorized Schedule has ", len(vectorized_schedule), " activities, iterative has ", len(iterative_schedule))
+
+    #run and time the weighted schedule with random revenue per activity
+    columnar_set.weights = np.random.randint(1,100,len(columnar_set))
+    start_time = timer()
+    weighted_value, weighted_schedule = WeightedIntervalSchedule(columnar_set)
+    end_time = timer();
+    time_weighted = timedelta(seconds=end_time-start_time)
+    print("Weighted Schedule time = ", time_weighted)
+    print("Weighted Schedule has ", len(weighted_schedule), " activities worth ", weighted_value, ", greedy schedule is worth ", columnar_set.weights[vectorized_schedule].sum())
+
+    #maintain the schedule online as activities are added and cancelled
+    online = OnlineScheduler()
+    start_time = timer()
+    ids = [online.insert(activity.start_time, activity.finish_time) for activity in activity_set]
+    for id in ids[0:len(ids)//10]:
+        online.delete(id)
+    end_time = timer();
+    time_online = timedelta(seconds=end_time-start_time)
+    print("Online Schedule time (", len(ids), " inserts, ", len(ids)//10, " cancellations) = ", time_online)
+    print("Online Schedule has ", len(online.schedule()), " activities, slot [0,1) free: ", online.isfree(0,1))
 
+    #assign every activity to a room using the fewest rooms
+    start_time = timer()
+    rooms, peak = IntervalPartition(columnar_set)
+    end_time = timer();
+    time_partition = timedelta(seconds=end_time-start_time)
+    print("Interval Partition time = ", time_partition)
+    print("Interval Partition uses ", peak, " rooms for ", len(columnar_set), " activities")
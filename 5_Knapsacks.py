@@ -1,17 +1,18 @@
 import numpy as np
 import sys
 import math
-import copy
-import operator #for sorting lists of classes by attribute
+import heapq
+import bisect
+import concurrent.futures
+from multiprocessing import shared_memory
+from memoization import Memo
 from timeit import default_timer as timer
 from datetime import timedelta
 
 class ItemOfValue:
     """An item of value"""
     #class representing an item with value, weight and per-unit value
-    value = -1
-    weight = -1
-    per_unit_value = -1
+    __slots__ = ('value', 'weight', 'per_unit_value')   #no per-instance __dict__
 
     def __init__(self, value, weight):
         self.value = int(value);
@@ -19,17 +20,150 @@ class ItemOfValue:
         self.per_unit_value = float(value)/float(weight)
 
     def __repr__(self):
-        return str("Item of Value") + str(self.__dict__)
+        return str("Item of Value") + str({'value': self.value, 'weight': self.weight, 'per_unit_value': self.per_unit_value})
     def __str__(self):
-        return str("Item of Value") + str(self.__dict__)
+        return self.__repr__()
+
+class ItemSet:
+    """A columnar set of items: contiguous NumPy arrays of values, weights and per-unit values
+
+    Every knapsack solver accepts an ItemSet in place of a list of ItemOfValue, and
+    then returns the chosen items as an ItemSet. items[k] is item k as an ItemOfValue.
+    """
+
+    def __init__(self, values, weights):
+        self.values = np.ascontiguousarray(values)
+        self.weights = np.ascontiguousarray(weights)
+        assert(self.values.shape == self.weights.shape)
+        self.per_unit_value = self.values/self.weights
+
+    @classmethod
+    def fromitems(cls, items):
+        """Build from a list of ItemOfValue."""
+        return cls([item.value for item in items], [item.weight for item in items])
+
+    @classmethod
+    def fromnpy(cls, filename, mmap_mode=None):
+        """Load from a .npy file of value/weight columns (n x 2, or a record array with value and weight fields)."""
+        data = np.load(filename, mmap_mode=mmap_mode)
+        if data.dtype.names is not None:
+            return cls(data['value'], data['weight'])
+        return cls(data[:, 0], data[:, 1])
+
+    @classmethod
+    def fromcsv(cls, filename, delimiter=',', skiprows=0, usecols=(0, 1)):
+        """Load from a CSV file with value and weight columns."""
+        data = np.loadtxt(filename, delimiter=delimiter, skiprows=skiprows, usecols=usecols, ndmin=2)
+        return cls(data[:, 0], data[:, 1])
+
+    @classmethod
+    def random(cls, n, low=1, high=100):
+        """n items with random integer values and weights in [low, high)."""
+        return cls(np.random.randint(low, high, n), np.random.randint(low, high, n))
+
+    def save(self, filename):
+        """Save as a .npy file that fromnpy reads back."""
+        np.save(filename, np.column_stack((self.values, self.weights)))
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, k):
+        item = ItemOfValue(self.values[k], self.weights[k])
+        item.value = self.values[k]     #ItemOfValue rounds to int, keep the column's dtype
+        item.weight = self.weights[k]
+        return item
+
+    def __iter__(self):
+        for k in range(0, len(self)):
+            yield self[k]
+
+    def take(self, indexes):
+        """The items at the given indexes as a new ItemSet."""
+        indexes = np.asarray(indexes, dtype=np.int64)
+        return ItemSet(self.values[indexes], self.weights[indexes])
+
+    def order(self):
+        """Indexes of the items by decreasing per-unit value (stable, like list.sort)."""
+        return np.argsort(-self.per_unit_value, kind='stable')
+
+    def sorted(self):
+        """The items sorted by decreasing per-unit value."""
+        return self.take(self.order())
+
+    def __repr__(self):
+        return str("Item set of ") + str(len(self)) + str(" items")
+    def __str__(self):
+        return self.__repr__()
+
+def itemcolumns(items):
+    """Values and weights of a list of ItemOfValue or an ItemSet."""
+    if isinstance(items, ItemSet):
+        return items.values, items.weights
+    return [item.value for item in items], [item.weight for item in items]
+
+def chooseitems(items, indexes):
+    """The chosen items, as an ItemSet for an ItemSet, otherwise as a list."""
+    if isinstance(items, ItemSet):
+        return items.take(indexes)
+    return [items[k] for k in indexes]
+
+def greedyindexes(weights, capacity):
+    """Indexes chosen by the greedy pass over a weight column: every item that still fits is taken
+
+    Alternates two vectorized steps: skip the items too heavy for the capacity left
+    (flatnonzero), then take the longest run of items that fits (cumsum and
+    searchsorted). Both look at windows that double in size, so the work is about
+    proportional to the items passed over, and the pass stops once no remaining item
+    can fit (suffix minimum of the weights).
+    """
+    weights = np.asarray(weights)
+    n = len(weights)
+    chosen = []
+    remaining = capacity
+    suffix_min = np.minimum.accumulate(weights[::-1])[::-1]
+    p = 0
+    while p < n and suffix_min[p] <= remaining:
+        #skip to the next item that fits (there is one, see suffix_min)
+        window = 16
+        while True:
+            fits = np.flatnonzero(weights[p:p+window] <= remaining)
+            if len(fits) > 0:
+                p += int(fits[0])
+                break
+            p += window
+            window *= 2
+
+        #take the longest run of items from p that fits
+        window = 16
+        while p < n:
+            totals = np.cumsum(weights[p:p+window])
+            count = int(np.searchsorted(totals, remaining, side='right'))
+            if count > 0:
+                chosen.append(np.arange(p, p + count))
+                remaining -= totals[count-1]
+                p += count
+            if count < len(totals):
+                break
+            window *= 2
+
+    return np.concatenate(chosen) if chosen else np.zeros(0, dtype=np.int64)
 
 def RecursiveGreedyKnapsack(items, k, n, remaining_weight, knapsack):
     """ Greedy 0-1 Knapsack using Recursion
         
         We assume that items are sorted by decreasing per-unit-value
+
+        The chosen items are appended to knapsack, which is also returned. For an
+        ItemSet the greedy pass is vectorized (greedyindexes, no recursion),
+        knapsack is left untouched, and like the other solvers the chosen items are
+        returned as an ItemSet.
         
         """
 
+    if isinstance(items, ItemSet):
+        return chooseitems(items, k + greedyindexes(items.weights[k:n], remaining_weight))
+
     m = k #we start looking at item k, n is the total number of items
     
     #move through items until we find one that fits in the bag
@@ -42,36 +176,354 @@ def RecursiveGreedyKnapsack(items, k, n, remaining_weight, knapsack):
         knapsack.append(items[m])
         RecursiveGreedyKnapsack(items, m+1, n, remaining_weight-items[m].weight, knapsack)
 
+    return knapsack
+
 def DynamicKnapsack(items, W):
     """Dynamic Knapsack Problem Point of Entry to recursive function"""
-    knapsack_value = []
     n = len(items)
-    c = np.zeros(W) - 1 #optimal values of all problems (integer weights W)
-    knapsack_value = DyanmicKnapsackRecursive(items, W,c) #make the recursive call
+    c = Memo(key=lambda items, k, W: (k, W)) #optimal values of all problems (first k items, integer weights W)
+    knapsack_value = c(DyanmicKnapsackRecursive)(items, n, W) #make the recursive call
     return knapsack_value
 
-def DyanmicKnapsackRecursive(items, W, c):
-    """Dynamic Knapsack Problem Recursive Call"""
-    if (c[W-1] >= 0):
-        return c[W-1]
+def DyanmicKnapsackRecursive(items, k, W):
+    """Dynamic Knapsack Problem Recursive Call
+
+    Best value using only the first k items with capacity W. Each yield is a
+    recursive call made through the memo (see DynamicKnapsack).
+    """
+    if k == 0:
+        return 0
+
+    best = yield items, k-1, W  #leave item k-1 out
+    new_weight = W - items[k-1].weight #if we add this item the new weight would be this
+    if (new_weight >= 0):   #if the item could be added
+        best = max(best, items[k-1].value + (yield items, k-1, new_weight))
+    return best
+
+
+def BottomUpKnapsack(items, W):
+    """Bottom-up 0-1 Knapsack in O(nW) time with one rolling value array
+
+    c[j] is the best value for capacity j using the items seen so far. Adding item k
+    with weight w and value v is one vectorized step over all capacities,
+        c[j] = max(c[j], c[j-w] + v)   for j >= w,
+    and the decision for every capacity is kept as a packed bitset (one bit per
+    capacity, W/8 bytes per item) so the chosen items can be reconstructed backwards.
+    Weights must be whole numbers (float columns such as 3.0 are fine); for other
+    weights use BranchAndBoundKnapsack.
+    Returns the best value and the list of chosen items.
+    """
+    n = len(items)
+    values, weights = itemcolumns(items)
+    weights = np.asarray(weights)
+    if np.any(weights != np.floor(weights)):
+        raise ValueError("BottomUpKnapsack needs whole number weights, use BranchAndBoundKnapsack for others")
+    weights = weights.astype(np.int64).tolist()
+    c = np.zeros(W+1, dtype=np.result_type(np.asarray(values).dtype, np.int64))   #float values (e.g. from a CSV) stay float
+    decisions = [None]*n        #decisions[k] bit i set: item k is taken at capacity weight+i
+
+    for k in range(0, n):
+        weight = weights[k]
+        if weight > W:
+            continue
+        with_item = c[0:W+1-weight] + values[k]   #new array, computed from the old values
+        take = with_item > c[weight:]
+        decisions[k] = np.packbits(take)
+        np.maximum(c[weight:], with_item, out=c[weight:])
+
+    chosen = []
+    j = W
+    for k in range(n-1, -1, -1):    #walk the decisions backwards from full capacity
+        if decisions[k] is None:
+            continue
+        i = j - weights[k]
+        if i >= 0 and (decisions[k][i >> 3] >> (7 - (i & 7))) & 1:
+            chosen.append(k)
+            j = i
+    chosen.reverse()
+
+    return c[W], chooseitems(items, chosen)
+
+def BranchAndBoundKnapsack(items, W, search='best', max_nodes=None, max_seconds=None):
+    """Exact 0-1 Knapsack by branch and bound, for any (e.g. huge or non-integer) weights
+
+    Items are considered in decreasing per-unit-value order, as for
+    RecursiveGreedyKnapsack. A node decides the next item (take it or leave it); its
+    upper bound is the fractional knapsack of the remaining items, which fills the
+    remaining capacity greedily and takes a fraction of the first item that does not
+    fit. Nodes whose bound cannot beat the incumbent are pruned, and the greedy
+    knapsack is the first incumbent. search is 'best' (expand the node with the
+    highest bound first) or 'depth' (depth-first, little memory).
+
+    The search stops early after max_nodes expanded nodes or max_seconds. Returns the
+    best value, the list of items achieving it and the optimality gap (upper bound on
+    the optimum minus best value, 0 when the search finished).
+    """
+    n = len(items)
+    if isinstance(items, ItemSet):
+        order = items.order().tolist()
+        weights = items.weights[order].tolist()
+        values = items.values[order].tolist()
     else:
-        n = len(items)
-        for k in range(0, n): #for all remaining items
-            new_weight = W - items[k].weight #if we add this item the new weight would be this
-            if (new_weight >= 0):   #if the item could be added
-                new_items = copy.copy(items)    #(not at all efficient) create an updated list
-                del new_items[k]                #by removing item k
-                
-                #recursive call
-                c[W-1] = max(c[W-1], items[k].value + DyanmicKnapsackRecursive(new_items, new_weight, c))
-        #c[W-1] = max(c[W-1],0) #create the memo from the maximum value
-    return c[W-1]
+        order = sorted(range(0, n), key=lambda k: items[k].per_unit_value, reverse=True)
+        weights = [items[k].weight for k in order]
+        values = [items[k].value for k in order]
+
+    #prefix sums for the fractional bound
+    weight_sums = [0]*(n+1)
+    value_sums = [0]*(n+1)
+    for k in range(0, n):
+        weight_sums[k+1] = weight_sums[k] + weights[k]
+        value_sums[k+1] = value_sums[k] + values[k]
 
+    def fractionalbound(k, capacity):
+        #items k..m-1 fit completely, then a fraction of item m
+        m = bisect.bisect_right(weight_sums, weight_sums[k] + capacity, lo=k) - 1
+        bound = value_sums[m] - value_sums[k]
+        if m < n:
+            bound += (capacity - (weight_sums[m] - weight_sums[k]))*values[m]/weights[m]
+        return bound
+
+    #greedy incumbent (the RecursiveGreedyKnapsack choice, without the recursion)
+    best_value = 0
+    best_chosen = None  #chosen items as a linked list (sorted index, rest)
+    remaining = W
+    for k in range(0, n):
+        if weights[k] <= remaining:
+            remaining -= weights[k]
+            best_value += values[k]
+            best_chosen = (k, best_chosen)
+
+    start_time = timer()
+    expanded = 0
+    counter = 0     #tie breaker so the heap never compares the chosen lists
+    open_nodes = [(-fractionalbound(0, W), counter, 0, 0, W, None)]  #(-bound, counter, next item, value, capacity, chosen)
+    while open_nodes:
+        if search == 'best':
+            node = heapq.heappop(open_nodes)
+        else:
+            node = open_nodes.pop()
+        negative_bound, _, k, value, capacity, chosen = node
+        if -negative_bound <= best_value:
+            if search == 'best':    #no open node can do better
+                open_nodes = []
+                break
+            continue
+
+        if (max_nodes is not None and expanded >= max_nodes) or (max_seconds is not None and expanded % 1024 == 0 and timer() - start_time > max_seconds):
+            open_nodes.append(node)     #out of budget, the node stays open
+            break
+        expanded += 1
+
+        #skip items that cannot fit anyway, they would only be left out
+        while k < n and weights[k] > capacity:
+            k += 1
+        if k == n:
+            continue
+
+        children = []
+        leave_bound = fractionalbound(k+1, capacity)
+        if value + leave_bound > best_value:
+            children.append((-(value + leave_bound), k+1, value, capacity, chosen))
+        take_value = value + values[k]
+        take_capacity = capacity - weights[k]
+        take_chosen = (k, chosen)
+        if take_value > best_value:
+            best_value = take_value
+            best_chosen = take_chosen
+        take_bound = fractionalbound(k+1, take_capacity)
+        if take_value + take_bound > best_value:
+            children.append((-(take_value + take_bound), k+1, take_value, take_capacity, take_chosen))
+
+        for child in children:     #for depth-first the take branch is explored first
+            counter += 1
+            child = (child[0], counter) + child[1:]
+            if search == 'best':
+                heapq.heappush(open_nodes, child)
+            else:
+                open_nodes.append(child)
+
+    upper_bound = best_value
+    for node in open_nodes:
+        upper_bound = max(upper_bound, -node[0])
+
+    chosen = []
+    while best_chosen is not None:
+        chosen.append(order[best_chosen[0]])
+        best_chosen = best_chosen[1]
+    chosen.reverse()
+
+    return best_value, chooseitems(items, chosen), upper_bound - best_value
+
+def subsetsums(weights, values):
+    """Weights and values of all 2^n subsets of n items; entry i is the subset of the items whose bits are set in i."""
+    subset_weights = np.zeros(1, dtype=np.result_type(np.asarray(weights).dtype, np.int64))
+    subset_values = np.zeros(1, dtype=np.result_type(np.asarray(values).dtype, np.int64))
+    for k in range(0, len(weights)):    #item k doubles the list: every subset without it, then with it
+        subset_weights = np.concatenate((subset_weights, subset_weights + weights[k]))
+        subset_values = np.concatenate((subset_values, subset_values + values[k]))
+    return subset_weights, subset_values
+
+def _meetinthemiddleblock(args):
+    """Best pairing of one block of first-half subsets with the second-half frontier (process pool worker)."""
+    low_weights, low_values, prefix_weight, prefix_value, frontier_weights, frontier_values, W = args
+    weights = low_weights + prefix_weight
+    values = low_values + prefix_value
+    j = np.searchsorted(frontier_weights, W - weights, side='right') - 1  #heaviest (so best) frontier entry that fits
+    fits = np.flatnonzero(j >= 0)     #the empty first-half subset always fits (prefix weights are at most W)
+    totals = values[fits] + frontier_values[j[fits]]  #in the dtype of the values (no float sentinel)
+    best = int(np.argmax(totals))
+    i = int(fits[best])
+    return totals[best], i, int(j[i])
+
+_shared_knapsack_memory = []       #the worker's attachments to the shared arrays
+_shared_knapsack_arrays = None     #and the arrays on top of them
+
+def _initmeetinthemiddleworker(specs):
+    """Process pool initializer: attach to the subset sums and frontier published in shared memory."""
+    global _shared_knapsack_memory, _shared_knapsack_arrays
+    _shared_knapsack_memory = [shared_memory.SharedMemory(name=name) for name, shape, dtype in specs]
+    _shared_knapsack_arrays = [np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+                               for memory, (name, shape, dtype) in zip(_shared_knapsack_memory, specs)]
+
+def _sharedmeetinthemiddleblock(args):
+    """Process pool task: _meetinthemiddleblock() for one prefix, against the shared arrays."""
+    prefix_weight, prefix_value, W = args
+    low_weights, low_values, frontier_weights, frontier_values = _shared_knapsack_arrays
+    return _meetinthemiddleblock((low_weights, low_values, prefix_weight, prefix_value, frontier_weights, frontier_values, W))
+
+def MeetInTheMiddleKnapsack(items, W, workers=None, maxbits=20):
+    """Exact 0-1 Knapsack by meet in the middle, for medium n (30-45) with any weights
+
+    The items are split in two halves and the 2^(n/2) subset sums of each half are
+    enumerated with NumPy. The second half is sorted by weight and pruned to its
+    non-dominated (weight, value) frontier, on which the value increases with the
+    weight, so for every subset of the first half the best partner is found by a
+    binary search for the remaining capacity. The first half is processed in blocks
+    of 2^maxbits subsets (fixing its remaining items), bounding memory. With
+    workers > 1 the blocks are made small enough that there are at least 4 per
+    worker, and are spread over a process pool; the frontier and the block subset
+    sums are published once through multiprocessing.shared_memory, so each task only
+    sends the weight and value of the items its block fixes.
+    Returns the best value and the list of chosen items.
+    """
+    n = len(items)
+    values, weights = itemcolumns(items)
+    n_second = min(n//2, maxbits)
+    n_first = n - n_second
+    n_low = min(n_first, maxbits)
+    if workers is not None and workers > 1:
+        n_low = min(n_low, max(n_first - (4*workers - 1).bit_length(), 1))   #at least 4*workers blocks
+
+    #second half: sort by weight (best value first on ties) and keep the non-dominated frontier
+    second_weights, second_values = subsetsums(weights[n_first:], values[n_first:])
+    order = np.lexsort((-second_values, second_weights))
+    second_values = second_values[order]
+    best_so_far = np.maximum.accumulate(second_values)
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = second_values[1:] > best_so_far[:-1]
+    frontier_weights = second_weights[order][keep]
+    frontier_values = second_values[keep]
+    frontier_masks = order[keep]
+    del second_weights, second_values, best_so_far, order, keep
+
+    #first half: low items enumerated once, the high items fixed per block
+    low_weights, low_values = subsetsums(weights[0:n_low], values[0:n_low])
+    n_high = n_first - n_low
+    blocks = []
+    for prefix in range(0, 1 << n_high):
+        prefix_weight = sum(weights[n_low + k] for k in range(0, n_high) if (prefix >> k) & 1)
+        prefix_value = sum(values[n_low + k] for k in range(0, n_high) if (prefix >> k) & 1)
+        if prefix_weight <= W:
+            blocks.append((prefix, prefix_weight, prefix_value))
+
+    if workers is None or workers <= 1 or len(blocks) <= 1:
+        results = [_meetinthemiddleblock((low_weights, low_values, prefix_weight, prefix_value, frontier_weights, frontier_values, W))
+                   for prefix, prefix_weight, prefix_value in blocks]
+    else:
+        shared = [low_weights, low_values, frontier_weights, frontier_values]
+        memories = [shared_memory.SharedMemory(create=True, size=array.nbytes) for array in shared]
+        try:
+            for memory, array in zip(memories, shared):
+                np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)[:] = array
+            specs = [(memory.name, array.shape, array.dtype) for memory, array in zip(memories, shared)]
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_initmeetinthemiddleworker, initargs=(specs,)) as executor:
+                results = list(executor.map(_sharedmeetinthemiddleblock, [(prefix_weight, prefix_value, W) for prefix, prefix_weight, prefix_value in blocks]))
+        finally:
+            for memory in memories:
+                memory.close()
+                memory.unlink()
+
+    best = max(range(0, len(results)), key=lambda b: results[b][0])
+    best_value, low_mask, j = results[best]
+    first_mask = low_mask | (blocks[best][0] << n_low)
+    second_mask = int(frontier_masks[j])
+
+    chosen = [k for k in range(0, n_first) if (first_mask >> k) & 1]
+    chosen += [n_first + k for k in range(0, n_second) if (second_mask >> k) & 1]
+    return best_value, chooseitems(items, chosen)
+
+def ApproximateKnapsack(items, W, epsilon=0.01):
+    """Approximate 0-1 Knapsack within a factor (1 - epsilon) of optimal (FPTAS)
+
+    Values are scaled down by K = epsilon*vmax/n and rounded down, so the total
+    scaled value is at most n^2/epsilon. A bottom-up dynamic program over total
+    scaled value keeps the minimum weight reaching each value,
+        m[V] = min(m[V], m[V - v] + w)   for every item (w, v),
+    one vectorized step per item with the decisions kept as packed bitsets (as in
+    BottomUpKnapsack). The best knapsack is the largest V with m[V] <= W. Time is
+    O(n^3/epsilon) whatever the size of the values or weights.
+    Returns the value (unscaled) and the list of chosen items.
+    """
+    if not epsilon > 0:
+        raise ValueError("epsilon must be positive, got " + str(epsilon))
+    values, weights = itemcolumns(items)
+    values = np.asarray(values)
+    weights = np.asarray(weights)
+    candidates = np.flatnonzero(weights <= W)   #items that can never fit are left out
+    n = len(candidates)
+    if n == 0:
+        return 0, chooseitems(items, [])
+    values = values[candidates]
+    weights = weights[candidates].tolist()
+    vmax = values.max()
+    K = epsilon*vmax/n
+    scaled = (values // K).astype(np.int64).tolist() if K > 0 else [0]*n
+
+    total = sum(scaled)
+    m = np.full(total+1, np.inf)
+    m[0] = 0
+    decisions = [None]*n        #decisions[k] bit i set: item k is taken at scaled value v+i
+    reached = 0                 #largest scaled value reachable so far
+    for k in range(0, n):
+        v = scaled[k]
+        top = reached + v + 1
+        with_item = m[0:top-v] + weights[k]
+        take = with_item < m[v:top]
+        decisions[k] = np.packbits(take)
+        np.minimum(m[v:top], with_item, out=m[v:top])
+        reached = top - 1
+
+    V = int(np.flatnonzero(m <= W)[-1])
+    chosen = []
+    for k in range(n-1, -1, -1):    #walk the decisions backwards from the best scaled value
+        i = V - scaled[k]
+        if i >= 0 and i < 8*len(decisions[k]) and (decisions[k][i >> 3] >> (7 - (i & 7))) & 1:
+            chosen.append(k)
+            V = i
+    chosen.reverse()
+
+    return values[chosen].sum(), chooseitems(items, candidates[chosen])
 
 def getknapsackinfo(knapsack):
-    """ Get weight and value of a 0-1 knapsack of ItemOfvalue entitites"""
+    """ Get weight and value of a 0-1 knapsack of ItemOfvalue entitites (or an ItemSet)"""
 
     n = len(knapsack)
+    if isinstance(knapsack, ItemSet):
+        weight = knapsack.weights.sum()
+        value = knapsack.values.sum()
+        return n, weight, value, value/weight
+
     weight = 0
     value = 0
 
@@ -85,40 +537,88 @@ def getknapsackinfo(knapsack):
 
 
 #main point of entry
-num_items = 20
-item_set = [];
-knapsack_max_weight = 500 #must be an integer
-
-#create a list of random items
-for i in range(0,num_items):
-
-    item_value = float(np.random.randint(1,100,1))
-    item_weight = float(np.random.randint(1,100,1))
-    item_set.append(ItemOfValue(item_value,item_weight))
-
-#sort the list by per-unit-value
-item_set.sort(key=operator.attrgetter('per_unit_value'),reverse=True)
-
-#display the list of items
-#for i in item_set:
-#    print(i)
-
-#run and time the recursive greedy approach
-start_time = timer()
-greedy_knapsack = [];    #start with an empty knapsack
-RecursiveGreedyKnapsack(item_set, 0, num_items, knapsack_max_weight, greedy_knapsack)
-end_time = timer();
-time_greedy = timedelta(seconds=end_time-start_time)
-print("Recursive Greedy Knapsack time =", time_greedy)
-n_items_in_knapsack, knapsack_weight, knapsack_value, knapsack_per_unit_value = getknapsackinfo(greedy_knapsack)
-print("Greedy Knapsack has", n_items_in_knapsack, "items valued at", knapsack_value, "at a total weight of", knapsack_weight)
-
-#run and time the dynamic programming approach
-start_time = timer()
-dynamic_knapsack = [];    #start with an empty knapsack
-dynamic_knapsack_value = DynamicKnapsack(item_set, knapsack_max_weight)
-end_time = timer();
-time_dynamic = timedelta(seconds=end_time-start_time)
-print("Dynamic Knapsack time =", time_dynamic)
-print("Dynamic Knapsack has value", dynamic_knapsack_value)
+if __name__ == "__main__":
+    num_items = 20
+    item_set = [];
+    knapsack_max_weight = 500 #must be an integer
+
+    #create a list of random items, sorted by per-unit-value
+    item_set = list(ItemSet.random(num_items).sorted())
+
+    #display the list of items
+    #for i in item_set:
+    #    print(i)
+
+    #run and time the recursive greedy approach
+    start_time = timer()
+    greedy_knapsack = [];    #start with an empty knapsack
+    RecursiveGreedyKnapsack(item_set, 0, num_items, knapsack_max_weight, greedy_knapsack)
+    end_time = timer();
+    time_greedy = timedelta(seconds=end_time-start_time)
+    print("Recursive Greedy Knapsack time =", time_greedy)
+    n_items_in_knapsack, knapsack_weight, knapsack_value, knapsack_per_unit_value = getknapsackinfo(greedy_knapsack)
+    print("Greedy Knapsack has", n_items_in_knapsack, "items valued at", knapsack_value, "at a total weight of", knapsack_weight)
+
+    #run and time the dynamic programming approach
+    start_time = timer()
+    dynamic_knapsack = [];    #start with an empty knapsack
+    dynamic_knapsack_value = DynamicKnapsack(item_set, knapsack_max_weight)
+    end_time = timer();
+    time_dynamic = timedelta(seconds=end_time-start_time)
+    print("Dynamic Knapsack time =", time_dynamic)
+    print("Dynamic Knapsack has value", dynamic_knapsack_value)
+
+    #run and time the bottom-up dynamic programming approach
+    start_time = timer()
+    bottomup_knapsack_value, bottomup_knapsack = BottomUpKnapsack(item_set, knapsack_max_weight)
+    end_time = timer();
+    time_bottomup = timedelta(seconds=end_time-start_time)
+    print("Bottom-up Knapsack time =", time_bottomup)
+    n_items_in_knapsack, knapsack_weight, knapsack_value, knapsack_per_unit_value = getknapsackinfo(bottomup_knapsack)
+    print("Bottom-up Knapsack has", n_items_in_knapsack, "items valued at", knapsack_value, "at a total weight of", knapsack_weight)
+
+    #run and time the branch and bound approach
+    start_time = timer()
+    bnb_knapsack_value, bnb_knapsack, bnb_gap = BranchAndBoundKnapsack(item_set, knapsack_max_weight, max_seconds=10)
+    end_time = timer();
+    time_bnb = timedelta(seconds=end_time-start_time)
+    print("Branch and Bound Knapsack time =", time_bnb)
+    n_items_in_knapsack, knapsack_weight, knapsack_value, knapsack_per_unit_value = getknapsackinfo(bnb_knapsack)
+    print("Branch and Bound Knapsack has", n_items_in_knapsack, "items valued at", knapsack_value, "at a total weight of", knapsack_weight, "(optimality gap", bnb_gap, ")")
+
+    #run and time the meet in the middle approach
+    start_time = timer()
+    mitm_knapsack_value, mitm_knapsack = MeetInTheMiddleKnapsack(item_set, knapsack_max_weight)
+    end_time = timer();
+    time_mitm = timedelta(seconds=end_time-start_time)
+    print("Meet in the Middle Knapsack time =", time_mitm)
+    n_items_in_knapsack, knapsack_weight, knapsack_value, knapsack_per_unit_value = getknapsackinfo(mitm_knapsack)
+    print("Meet in the Middle Knapsack has", n_items_in_knapsack, "items valued at", knapsack_value, "at a total weight of", knapsack_weight)
+
+    #run and time the approximate (FPTAS) approach, within 10% of optimal
+    start_time = timer()
+    approximate_knapsack_value, approximate_knapsack = ApproximateKnapsack(item_set, knapsack_max_weight, epsilon=0.1)
+    end_time = timer();
+    time_approximate = timedelta(seconds=end_time-start_time)
+    print("Approximate Knapsack time =", time_approximate)
+    n_items_in_knapsack, knapsack_weight, knapsack_value, knapsack_per_unit_value = getknapsackinfo(approximate_knapsack)
+    print("Approximate Knapsack has", n_items_in_knapsack, "items valued at", knapsack_value, "at a total weight of", knapsack_weight)
+
+    #a large columnar catalog of items, solved without per-item objects
+    num_catalog_items = 100000
+    catalog = ItemSet.random(num_catalog_items).sorted()
+    catalog_max_weight = 10*num_catalog_items
+
+    start_time = timer()
+    catalog_greedy = RecursiveGreedyKnapsack(catalog, 0, num_catalog_items, catalog_max_weight, [])
+    end_time = timer();
+    print("Catalog Greedy Knapsack time =", timedelta(seconds=end_time-start_time))
+    n_items_in_knapsack, knapsack_weight, knapsack_value, knapsack_per_unit_value = getknapsackinfo(catalog_greedy)
+    print("Catalog Greedy Knapsack has", n_items_in_knapsack, "items valued at", knapsack_value, "at a total weight of", knapsack_weight)
 
+    start_time = timer()
+    catalog_knapsack_value, catalog_knapsack, catalog_gap = BranchAndBoundKnapsack(catalog, catalog_max_weight, max_seconds=10)
+    end_time = timer();
+    print("Catalog Branch and Bound Knapsack time =", timedelta(seconds=end_time-start_time))
+    n_items_in_knapsack, knapsack_weight, knapsack_value, knapsack_per_unit_value = getknapsackinfo(catalog_knapsack)
+    print("Catalog Branch and Bound Knapsack has", n_items_in_knapsack, "items valued at", knapsack_value, "at a total weight of", knapsack_weight, "(optimality gap", catalog_gap, ")")
@@ -1,9 +1,9 @@
 import numpy as np
 import math
-import matplotlib as mpl
-from matplotlib import pyplot as plt
-
-fig, ((ax1, ax2, ax3)) = plt.subplots(1, 3) #make global for convenience - not recommended in general
+import concurrent.futures
+from multiprocessing import shared_memory
+from progress import Observer, PrintObserver, observersdue, notifyobservers, finishobservers
+from gaengine import GeneticAlgorithm, BitGenome, IslandModel, rouletteselection, tournamentselection
 
 def robotsearch(grid, moves):
     """Given an m x n grid of items evaluate a score based on items picked up by a robot searching the space.
@@ -60,11 +60,162 @@ def robotsearch(grid, moves):
     return robot_score_history[len(robot_score_history)-1], robot_path #just return the final score and path
 
 
-def garobotsearch(m, n, itemfraction, nummoves, population_size, maxits):
+def batchrobotsearch(grid, population):
+    """Evaluate robotsearch() for every gene (row) of population at once.
+
+    The moves of all genes are decoded together and all robots advance in lockstep
+    with clipped NumPy index arithmetic. The cells each robot enters are marked in a
+    population x cells visited mask, so a robot's score is the starting cell plus
+    the items in the cells it visited, exactly as robotsearch() counts them.
+    Returns the array of scores; the path image is left to robotsearch().
+    """
+    m, n = grid.shape
+    population_size, gene_size = population.shape
+    assert(gene_size%2 == 0)
+    num_moves = gene_size//2
+
+    #decode the moves: 00 left, 01 right, 10 down, 11 up
+    move_codes = 2*population[:, 0::2] + population[:, 1::2]
+    row_steps = np.array([0, 0, -1, 1])[move_codes]
+    col_steps = np.array([-1, 1, 0, 0])[move_codes]
+
+    robot_rows = np.zeros(population_size, dtype=np.int64)
+    robot_cols = np.zeros(population_size, dtype=np.int64)
+    visited_cells = np.zeros((population_size, num_moves), dtype=np.int64)
+    for i in range(0, num_moves):
+        np.clip(robot_rows + row_steps[:, i], 0, m-1, out=robot_rows) #a move that hits the edge leaves the robot unmoved
+        np.clip(robot_cols + col_steps[:, i], 0, n-1, out=robot_cols)
+        visited_cells[:, i] = robot_rows*n + robot_cols
+
+    visited = np.zeros((population_size, m*n), dtype=bool)
+    visited[np.arange(population_size)[:, None], visited_cells] = True
+
+    return grid[0, 0] + visited @ grid.ravel()
+
+
+def packedrobotsearch(grid, packed_population, gene_size):
+    """batchrobotsearch() for a bit-packed population."""
+    return batchrobotsearch(grid, np.unpackbits(packed_population, axis=1, count=gene_size))
+
+
+class RobotFitness:
+    """The fitness of a bit-packed population: packedrobotsearch() on grid (a picklable fitness for the GA engine)."""
+
+    def __init__(self, grid, gene_size):
+        self.grid = grid
+        self.gene_size = gene_size
+
+    def __call__(self, population):
+        return packedrobotsearch(self.grid, population, self.gene_size)
+
+
+_shared_grid_memory = None     #the worker's attachment to the shared grid
+_shared_grid = None            #and the grid as an array on top of it
+
+def _initfitnessworker(name, shape, dtype):
+    """Process pool initializer: attach to the grid published in shared memory."""
+    global _shared_grid_memory, _shared_grid
+    _shared_grid_memory = shared_memory.SharedMemory(name=name)
+    _shared_grid = np.ndarray(shape, dtype=dtype, buffer=_shared_grid_memory.buf)
+
+def _evaluatefitnesschunk(packed_genes, gene_size):
+    """Process pool task: score a chunk of bit-packed genes against the shared grid."""
+    return packedrobotsearch(_shared_grid, packed_genes, gene_size)
+
+class GARobotPlotObserver(Observer):
+    """Plot the items, the best path of the current population and the best path overall.
+
+    matplotlib is only imported, and the figure only created, when this observer is used.
+    """
+
+    def __init__(self, interval=100):
+        super().__init__(interval)
+        from matplotlib import pyplot as plt
+        self.plt = plt
+        self.fig, ((self.ax1, self.ax2, self.ax3)) = plt.subplots(1, 3)
+
+    def update(self, iteration, grid, population_best_robot_path, best_robot_path, **state):
+        self.ax1.matshow(grid)
+        self.ax2.matshow(population_best_robot_path)
+        self.ax3.matshow(best_robot_path)
+        self.plt.pause(0.005)
+        self.ax1.set_title('Original Items',fontsize=11)
+        self.ax2.set_title('Best Path - Current Population',fontsize=11)
+        self.ax3.set_title('Best Path - Overall',fontsize=11)
+        self.fig.suptitle(['GA Robot Search at Iteration ',iteration])
+
+    def finish(self, **state):
+        self.plt.show()
+
+
+class ParallelFitness:
+    """Evaluate batchrobotsearch() over a population across a process pool.
+
+    The grid is published once through multiprocessing.shared_memory, and genes are
+    sent to the workers in chunks of chunksize, bit-packed to keep pickling small
+    (evaluatepacked() takes a population that is already bit-packed).
+    The fitness is deterministic, so results do not depend on which worker scores which chunk.
+    Use as a context manager so the pool and the shared memory are released.
+    """
+
+    def __init__(self, grid, workers, chunksize=256):
+        self.chunksize = chunksize
+        self.memory = shared_memory.SharedMemory(create=True, size=grid.nbytes)
+        shared_grid = np.ndarray(grid.shape, dtype=grid.dtype, buffer=self.memory.buf)
+        shared_grid[:] = grid
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_initfitnessworker,
+                                                               initargs=(self.memory.name, grid.shape, grid.dtype))
+
+    def __call__(self, population):
+        return self.evaluatepacked(np.packbits(population.astype(np.uint8), axis=1), population.shape[1])
+
+    def evaluatepacked(self, packed, gene_size):
+        futures = [self.executor.submit(_evaluatefitnesschunk, packed[start:start+self.chunksize], gene_size)
+                   for start in range(0, len(packed), self.chunksize)]
+        return np.concatenate([future.result() for future in futures])
+
+    def close(self):
+        self.executor.shutdown()
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+    def __exit__(self, *args):
+        self.close()
+
+
+def garobotsearch(m, n, itemfraction, nummoves, population_size, maxits, workers=None, chunksize=256, seed=None, observers=None,
+                  selection='roulette', cache_size=4096, islands=1, migration_interval=20, migration_size=2, topology='ring'):
 
     """Setup and run a Genetic Algorithm to optimize the number of items a robot picks up
-        as evaluated by the robotsearch() function.
+        as evaluated by the robotsearch() function. The GA runs on the engine in gaengine.py.
+
+        With workers > 1 the fitness of the population is evaluated across a process
+        pool (see ParallelFitness). seed makes a run reproducible. The search is
+        headless: progress is only reported to the given observers (see progress.py),
+        e.g. PrintObserver or GARobotPlotObserver.
+
+        Genes are stored bit-packed (np.packbits) and each generation is produced with
+        whole population operators: selection ('roulette' or 'tournament'), crossover
+        with precomputed masks and XOR mutation with Bernoulli masks (see BitGenome).
+
+        With islands > 1 that many populations of population_size evolve in their own
+        processes, exchanging their migration_size fittest genes every migration_interval
+        generations along the topology (see IslandModel); observer intervals then count
+        migrations rather than generations. workers is for a single population only.
+
+        Fitness goes through a least recently used cache of cache_size genes keyed by
+        the packed gene bytes, so unchanged and duplicate genes are not re-evaluated
+        (cache_size=0 turns it off). The observers get its hit rate as cache_hitrate.
+
+        Returns the best gene (unpacked), its fitness and its robot path.
     """
+    if observers is None:
+        observers = []
+
+    if seed is not None:
+        np.random.seed(seed)
 
     #setup the initial grid an populate it
     grid = np.zeros([m,n])
@@ -77,133 +228,81 @@ def garobotsearch(m, n, itemfraction, nummoves, population_size, maxits):
         grid[item_rows[i], item_cols[i]] = 1.0
         best_possible_score += grid[item_rows[i], item_cols[i]]
 
-    #display initial setup
-    print("Running GA on ", m, " x ", n, " grid with ", itemfraction*100, "% item density. Best possible score = ", best_possible_score)
-
-    #set population, genes are twice as long as moves to encode 00, 01, 10, 11 as a move
+    #genes are twice as long as moves to encode 00, 01, 10, 11 as a move
     gene_size = int(nummoves*2)
-    population = np.random.randint(2, size=[population_size, nummoves*2])
-    new_population = 0*population
-
-    #initial fitness evaluation
-    fitness = np.zeros(population_size)
-    population_best_fitness = 0
-    for i in range(0, population_size):
-        score, robot_path = robotsearch(grid, population[i,:])
-        fitness[i] = score
-        if fitness[i] > population_best_fitness:
-            population_best_robot_path = np.copy(robot_path)
-            population_best_fitness = fitness[i]
-            population_best_gene = np.copy(population[i,:])
-
-    #best over all populations
-    best_robot_path = np.copy(population_best_robot_path)
-    best_fitness = population_best_fitness
-    best_gene = np.copy(population_best_gene)
-
-    #normalize fitness
-    normalized_fitness = fitness/max(fitness)
-
-    #set ga random parameters
-    crossover_percent = 0.7
-    mutation_percent = 0.1
-
-    #start looping
-    iteration = 0
-    while iteration < maxits:
-    
-        iteration = iteration + 1
+    genome = BitGenome(gene_size, crossover_percent=0.7, mutation_percent=0.1)
+    if selection == 'roulette':
+        select = rouletteselection
+    elif selection == 'tournament':
+        select = tournamentselection
+    else:
+        raise ValueError("Unknown selection " + str(selection))
 
-        #The following code block allocates an array of population indexes where the number of times
-        #a given population index appears in the list is proportional to its fitness. For example:
-        #if gene 1, gene 2, and gene 3 have respective fitness 10, 5, and 20, then gene 3 would appear
-        #twice as many times in the list as gene 1, and 4 times as may times as gene 2.
+    #fitness evaluation, in this process or across a pool of workers
+    parallel_fitness = None
+    if workers is not None and workers > 1:
+        if islands > 1:
+            raise ValueError("Islands already run in their own processes, use workers with a single population")
+        parallel_fitness = ParallelFitness(grid, workers, chunksize)
+        fitness = lambda population: parallel_fitness.evaluatepacked(population, gene_size)
+    else:
+        fitness = RobotFitness(grid, gene_size)
 
-        gene_count_by_fitness = np.zeros(population_size+1) #the number of counts assigned based on fitness
-        for i in range(0, population_size):
-            gene_count_by_fitness[i+1] = gene_count_by_fitness[i] + int(normalized_fitness[i]*100) #the count is proportional to the normalized fitness
-            
-        gene_selection_lottery_array = np.zeros(int(gene_count_by_fitness[population_size])) #this will store the gene labels for selection
-            
-        for i in range(0, population_size):
-            gene_selection_lottery_array[int(gene_count_by_fitness[i]):int(gene_count_by_fitness[i+1])] = i #and here we put gene i in the selection array a number of times proportional to fitness
+    engines = [GeneticAlgorithm(genome, fitness, population_size, select, cache_size=cache_size) for island in range(0, islands)]
+    if islands > 1:
+        engine = IslandModel(engines, migration_interval, migration_size, topology, seed)
+    else:
+        engine = engines[0]
 
-        
-        #now we are ready to produce a new generation / population
-        for i in range(1, int(population_size/2)): #we mate pairs, so take half the population size
-            
-            #step 1 is selection: select two genes (biased towards better fitness)
-            lottery_tickets = np.random.randint(max(gene_count_by_fitness), size=2)
-            
-            parent1_index = int(gene_selection_lottery_array[lottery_tickets[0]])
-            parent2_index = int(gene_selection_lottery_array[lottery_tickets[1]])
-            
-            parent1 = population[parent1_index,:]
-            parent2 = population[parent2_index,:]
-            
-            #step 2 is crossover/mating - we may crossover or not in this implementation
-            dice_role = np.random.rand(1)
-            if dice_role[0] <= crossover_percent:
-                crossover_index = np.random.randint(gene_size, size=1)
-                child1 = parent1 #start the child as parent 1
-                child1[int(crossover_index):int(gene_size)] = parent2[int(crossover_index):int(gene_size)] #add parent 2's part to the end
-                child2 = parent2
-                child2[int(crossover_index):int(gene_size)] = parent1[int(crossover_index):int(gene_size)] #add parent 1's part to the end
-                new_population[2*i,:] = child1
-                new_population[2*i+1] = child2
+    try:
+        #initial population (the path image is only needed for the best gene)
+        engine.initialize()
+        best_fitness = engine.best_fitness
+        score, best_robot_path = robotsearch(grid, genome.unpack(engine.best_gene))
+        if observers:
+            notifyobservers(observers, 0, grid=grid, best_possible_score=best_possible_score,
+                            population_best_fitness=engine.population_best_fitness, population_best_robot_path=best_robot_path,
+                            best_fitness=best_fitness, best_robot_path=best_robot_path, cache_hitrate=engine.hitrate())
+
+        #start looping
+        while engine.generation < maxits:
+            if islands > 1:
+                engine.step(min(migration_interval, maxits - engine.generation))
             else:
-                new_population[2*i,:] = parent1 #if no cross over keep both parents
-                new_population[2*i+1,:] = parent2
-        
-            #step 3: mutation - we may mutate each bit of the gene or not in this implementation
-            dice_role = np.random.rand(gene_size)
-            for mutation_index in range(0, gene_size):
-                if dice_role[mutation_index] <= mutation_percent:
-                    new_population[i,mutation_index] = (new_population[i,mutation_index]+1)%2 #just a toggle because it is binary
-
-        #population has been updated
-        population = np.copy(new_population)
-    
-        #fitness evaluation
-        population_best_fitness = 0
-        for i in range(0, population_size):
-            score, robot_path = robotsearch(grid, population[i,:])
-            fitness[i] = score
-            if fitness[i] > population_best_fitness:
-                population_best_robot_path = np.copy(robot_path)
-                population_best_fitness = fitness[i]
-                population_best_gene = np.copy(population[i,:])
-
-        #best over all populations
-        if population_best_fitness > best_fitness:
-            best_robot_path = np.copy(population_best_robot_path)
-            best_fitness = population_best_fitness
-            best_gene = np.copy(population_best_gene)
-    
-        #normalize fitness
-        normalized_fitness = fitness/max(fitness)
-        
-        print("iteration ", iteration, " max pop fitness = ", population_best_fitness, " max overall = ", best_fitness)
+                engine.step()
+
+            #best over all populations
+            if engine.best_fitness > best_fitness:
+                best_fitness = engine.best_fitness
+                score, best_robot_path = robotsearch(grid, genome.unpack(engine.best_gene))
+
+            #with islands the observer intervals count migrations
+            step = engine.migrations if islands > 1 else engine.generation
+            if observersdue(observers, engine.generation, step):
+                score, population_best_robot_path = robotsearch(grid, genome.unpack(engine.population_best_gene))
+                notifyobservers(observers, engine.generation, step, grid=grid, best_possible_score=best_possible_score,
+                                population_best_fitness=engine.population_best_fitness, population_best_robot_path=population_best_robot_path,
+                                best_fitness=best_fitness, best_robot_path=best_robot_path, cache_hitrate=engine.hitrate())
+    finally:
+        if parallel_fitness is not None:
+            parallel_fitness.close()
+        if islands > 1:
+            engine.close()
 
-        if iteration%100 == 0:
-            ax1.matshow(grid)
-            ax2.matshow(population_best_robot_path)
-            ax3.matshow(best_robot_path)
-            plt.pause(0.005)
-            ax1.set_title('Original Items',fontsize=11)
-            ax2.set_title('Best Path - Current Population',fontsize=11)
-            ax3.set_title('Best Path - Overall',fontsize=11)
-            fig.suptitle(['GA Robot Search at Iteration ',iteration])
+    finishobservers(observers, best_fitness=best_fitness, best_robot_path=best_robot_path)
 
-    plt.show()
+    return genome.unpack(engine.best_gene), best_fitness, best_robot_path
 
 #main point of entry
+if __name__ == "__main__":
 
-maxits = 1000
-population_size = 20
-nummoves = 300
-m = 30
-n = 30
-itemfraction = 0.1 #multiply by 100 for percentage of grid points that are items
+    maxits = 1000
+    population_size = 20
+    nummoves = 300
+    m = 30
+    n = 30
+    itemfraction = 0.1 #multiply by 100 for percentage of grid points that are items
 
-garobotsearch(m, n, itemfraction, nummoves, population_size, maxits)
+    print("Running GA on ", m, " x ", n, " grid with ", itemfraction*100, "% item density.")
+    observers = [PrintObserver(['population_best_fitness', 'best_fitness', 'cache_hitrate'], interval=1), GARobotPlotObserver(interval=100)]
+    best_gene, best_fitness, best_robot_path = garobotsearch(m, n, itemfraction, nummoves, population_size, maxits, observers=observers)
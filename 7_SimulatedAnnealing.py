@@ -2,11 +2,9 @@ import numpy as np
 import sys
 import math
 import copy
-from matplotlib import pyplot as plt
 from timeit import default_timer as timer
 from datetime import timedelta
-
-fig, ((ax1, ax2)) = plt.subplots(1, 2) #make global for convenience - not recommended in general
+from progress import Observer, PrintObserver, observersdue, notifyobservers, finishobservers
 
 def energyfunction(state, x, y):
     n = len(state)
@@ -37,7 +35,78 @@ def neighbourfunction(state):
 
     return newstate
 
-def travelingSalesmanSA(s0, x, y, E, S, maxits, innermaxits):
+def distancefunction(x, y):
+    """Return distance(a, b), the distance between cities a and b, computed in O(1) from
+    the coordinates (a distance matrix takes n^2 memory and is no faster to look up in Python)."""
+    xs = np.asarray(x, dtype=float).tolist()
+    ys = np.asarray(y, dtype=float).tolist()
+    return lambda a, b: math.hypot(xs[a] - xs[b], ys[a] - ys[b])
+
+def swapdelta(state, i, j, distance):
+    """The change in tour length from swapping the cities at positions i and j of state (a list).
+
+    Only the (at most four) edges next to positions i and j change, so this is O(1)
+    however long the tour is. state is left unchanged.
+    """
+    n = len(state)
+    edges = {(i - 1) % n, i, (j - 1) % n, j} #edge k joins positions k and k+1 (and n-1 joins back to 0)
+    before = sum([distance(state[k], state[(k + 1) % n]) for k in edges])
+    state[i], state[j] = state[j], state[i]
+    after = sum([distance(state[k], state[(k + 1) % n]) for k in edges])
+    state[i], state[j] = state[j], state[i]
+    return after - before
+
+class TSPPlotObserver(Observer):
+    """Plot the current and the best tour.
+
+    matplotlib is only imported, and the figure only created, when this observer is used.
+    """
+
+    def __init__(self, interval=1):
+        super().__init__(interval)
+        from matplotlib import pyplot as plt
+        self.plt = plt
+        self.fig, ((self.ax1, self.ax2)) = plt.subplots(1, 2)
+
+    def update(self, iteration, state, beststate, x, y, **other):
+        #add loop back to first state for plotting
+        xplot = np.append(x[state],x[state[0]])
+        yplot = np.append(y[state],y[state[0]])
+        xbestplot = np.append(x[beststate],x[beststate[0]])
+        ybestplot = np.append(y[beststate],y[beststate[0]])
+        
+        #plot the current and best solutions
+        self.ax1.cla()
+        self.ax1.plot(xplot,yplot)
+        self.ax2.cla()
+        self.ax2.plot(xbestplot,ybestplot)
+        self.ax1.set_title('Best at current iteration',fontsize=11)
+        self.ax2.set_title('Best overall',fontsize=11)
+        self.fig.suptitle(['SA Traveling Salesman Iteration # ',iteration])
+        self.plt.pause(0.005)
+
+    def finish(self, **state):
+        self.plt.show()
+
+def travelingSalesmanSA(s0, x, y, E, S, maxits, innermaxits, observers=None, incremental=None):
+    """Simulated annealing for the traveling salesman problem.
+
+    When E is energyfunction and S is neighbourfunction (or incremental=True with
+    them) the search is incremental: the energy change of each swap is computed in
+    O(1) by swapdelta(), accepted moves are applied to the state in place, and the
+    best state is only copied when an uphill move leaves it. Other energy or
+    neighbour functions are called for every neighbour (as with incremental=False).
+
+    Headless: progress is only reported to the given observers (see progress.py),
+    once per outer iteration, e.g. PrintObserver or TSPPlotObserver.
+    """
+    if observers is None:
+        observers = []
+    builtin = E is energyfunction and S is neighbourfunction
+    if incremental is None:
+        incremental = builtin
+    elif incremental and not builtin:
+        raise ValueError("incremental search needs E = energyfunction and S = neighbourfunction")
 
     c = 100
     iteration = 0
@@ -49,34 +118,58 @@ def travelingSalesmanSA(s0, x, y, E, S, maxits, innermaxits):
     best_E_history = np.zeros(maxits)
     E_history = np.zeros(maxits)
     
+    if incremental:
+        distance = distancefunction(x, y)
+        state = np.asarray(s0).tolist() #python lists index faster than numpy arrays one element at a time
+        best_is_current = True #the best state is only copied when the search moves away from it
+        n = len(state)
+
     while (iteration < maxits):
         
         iteration += 1
 
-        #inner iterations keep c constant
-        for inner_iteration in range(0,innermaxits):
-
-            neighbour = S(state)
-            neighbourE = E(neighbour, x, y)
-
-            if (neighbourE < stateE):
-                state = np.copy(neighbour)
-                stateE = neighbourE #accept the solution
-            else:
-            
-                deltaE = neighbourE - stateE
-                Paccept = np.exp(-deltaE/c)
-                chance = np.random.rand(1)[0]
-                if chance < Paccept:
+        if incremental:
+            #inner iterations keep c constant, draw their random numbers up front
+            swaps = np.random.randint(n, size=(innermaxits, 2)).tolist()
+            chances = np.random.rand(innermaxits).tolist()
+            for (i, j), chance in zip(swaps, chances):
+                deltaE = swapdelta(state, i, j, distance)
+
+                if deltaE < 0 or chance < math.exp(-deltaE/c):
+                    if deltaE >= 0 and best_is_current:
+                        beststate = state[:] #snapshot the best before leaving it
+                        best_is_current = False
+                    state[i], state[j] = state[j], state[i] #accept the solution
+                    stateE += deltaE
+
+                    if stateE < beststateE:
+                        beststateE = stateE
+                        best_is_current = True
+        else:
+            #inner iterations keep c constant
+            for inner_iteration in range(0,innermaxits):
+
+                neighbour = S(state)
+                neighbourE = E(neighbour, x, y)
+
+                if (neighbourE < stateE):
                     state = np.copy(neighbour)
                     stateE = neighbourE #accept the solution
-
-                #temperature = float(max_its)/float(iteration + 1)
+                else:
                 
-            #can't hurt to keep the best solution, especially for plotting purposes
-            if stateE < beststateE:
-                beststateE = stateE
-                beststate = np.copy(state)
+                    deltaE = neighbourE - stateE
+                    Paccept = np.exp(-deltaE/c)
+                    chance = np.random.rand(1)[0]
+                    if chance < Paccept:
+                        state = np.copy(neighbour)
+                        stateE = neighbourE #accept the solution
+
+                    #temperature = float(max_its)/float(iteration + 1)
+                    
+                #can't hurt to keep the best solution, especially for plotting purposes
+                if stateE < beststateE:
+                    beststateE = stateE
+                    beststate = np.copy(state)
         
         #update history - outer iterations only
         best_E_history[iteration-1] = beststateE
@@ -84,52 +177,41 @@ def travelingSalesmanSA(s0, x, y, E, S, maxits, innermaxits):
     
         c = 0.9*c #simple cooling
         
-        #update the user
-        print("Outer iteration ", iteration, " Energy = ", stateE)
-        
-        #add loop back to first state for plotting
-        xplot = np.append(x[state],x[state[0]])
-        yplot = np.append(y[state],y[state[0]])
-        xbestplot = np.append(x[beststate],x[beststate[0]])
-        ybestplot = np.append(y[beststate],y[beststate[0]])
-        
-        #plot the current and best solutions
-        ax1.cla()
-        ax1.plot(xplot,yplot)
-        ax2.cla()
-        ax2.plot(xbestplot,ybestplot)
-        ax1.set_title('Best at current iteration',fontsize=11)
-        ax2.set_title('Best overall',fontsize=11)
-        fig.suptitle(['SA Traveling Salesman Iteration # ',iteration])
-        plt.pause(0.005)
+        #update the observers
+        if observersdue(observers, iteration):
+            if incremental:
+                notifyobservers(observers, iteration, energy=stateE, best_energy=beststateE, state=np.array(state),
+                                beststate=np.array(state if best_is_current else beststate), x=x, y=y)
+            else:
+                notifyobservers(observers, iteration, energy=stateE, best_energy=beststateE, state=state, beststate=beststate, x=x, y=y)
     
-    plt.show()
+    if incremental:
+        beststate = np.array(state if best_is_current else beststate)
+    finishobservers(observers, best_energy=beststateE, beststate=beststate)
 
     return beststate, E_history, best_E_history
     
 #main
+if __name__ == "__main__":
 
-n = 20 #number of cities
-
-#random cities example
-"""
-x = np.random.rand(n)
-y = np.random.rand(n)
-s0 = range(0,n) #intial state, start by visiting them in order
-"""
-
-#circle example (optimal solution is just to traverse the circle)
-phi = np.linspace(0, 2*math.pi, n, endpoint=False)
-x = np.cos(phi)
-y = np.sin(phi)
-s0 = np.random.permutation(n)
-
-maxits = 100
-innermaxits = 500
-
-beststate, E_history, best_E_history = travelingSalesmanSA(s0,x, y, energyfunction, neighbourfunction,maxits,innermaxits)
-#could plot E_history or best_E_history here
+    n = 20 #number of cities
 
+    #random cities example
+    """
+    x = np.random.rand(n)
+    y = np.random.rand(n)
+    s0 = range(0,n) #intial state, start by visiting them in order
+    """
 
+    #circle example (optimal solution is just to traverse the circle)
+    phi = np.linspace(0, 2*math.pi, n, endpoint=False)
+    x = np.cos(phi)
+    y = np.sin(phi)
+    s0 = np.random.permutation(n)
 
+    maxits = 100
+    innermaxits = 500
 
+    observers = [PrintObserver(['energy'], prefix="Outer iteration"), TSPPlotObserver()]
+    beststate, E_history, best_E_history = travelingSalesmanSA(s0,x, y, energyfunction, neighbourfunction,maxits,innermaxits, observers)
+    #could plot E_history or best_E_history here
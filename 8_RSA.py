@@ -5,16 +5,19 @@ import copy
 from matplotlib import pyplot as plt
 from timeit import default_timer as timer
 from datetime import timedelta
+from memoization import memoize
 
 def gcd(a,b):
     d = euclid(abs(a), abs(b))
     return d
     
+@memoize(maxsize=4096)
 def euclid(a,b):
+    #the recursive call is yielded to the memo, which evaluates it on an explicit stack (no recursion limit)
     if b == 0:
         return a
     else:
-        return euclid(b, a%b)
+        return (yield b, a%b)
 
 def extendedgcd(a,b):
     temp = extendedeuclid(abs(a), abs(b))
@@ -23,11 +26,12 @@ def extendedgcd(a,b):
     y = temp[2]
     return d, x, y
 
+@memoize(maxsize=4096)
 def extendedeuclid(a, b):
     if b == 0:
         return (a, 1, 0)
     else:
-        temp = extendedeuclid(b, a%b) #returns tuple (d, x, y)
+        temp = yield b, a%b #recursive call through the memo, returns tuple (d, x, y)
         d = temp[0]
         x = temp[2]
         y = temp[1] - (a//b)*temp[2] #floor division
@@ -2,24 +2,56 @@ import numpy as np
 import sys
 import math
 import copy
-from matplotlib import image as mpimg
-from matplotlib import pyplot as plt
 from timeit import default_timer as timer
 from datetime import timedelta
+from progress import Observer, PrintObserver, observersdue, notifyobservers, finishobservers
 
-fig, ((ax1, ax2, ax3)) = plt.subplots(1, 3) #make global for convenience - not recommended in general
+class KMeansPlotObserver(Observer):
+    """Plot the original image, the image drawn with the means and the groups.
 
-def kmeanssegment(imgdata, k, max_its):
+    matplotlib is only imported, and the figure only created, when this observer is used.
+    """
+
+    def __init__(self, interval=1):
+        super().__init__(interval)
+        from matplotlib import pyplot as plt
+        self.plt = plt
+        self.fig, ((self.ax1, self.ax2, self.ax3)) = plt.subplots(1, 3)
+
+    def update(self, iteration, imgdata, mean_vector, mean_index_for_pixel, **state):
+        #produce an image that shows the means for each pixel (just for visualization)
+        imgdata_copy = copy.copy(imgdata)
+        imgdata_copy[:,:,0:3] = mean_vector[mean_index_for_pixel]
+
+        self.ax1.set_title('Original Image',fontsize=11)
+        self.ax2.set_title(['K-Means at Iteration ',iteration],fontsize=11)
+        self.ax3.set_title(['Groups at Iteration ', iteration],fontsize=11)
+        self.ax1.matshow(imgdata)
+        self.ax2.matshow(imgdata_copy)
+        self.ax3.matshow(mean_index_for_pixel)
+        self.ax1.xaxis.set_ticks_position('bottom')
+        self.ax2.xaxis.set_ticks_position('bottom')
+        self.ax3.xaxis.set_ticks_position('bottom')
+        self.plt.pause(0.005)
+
+    def finish(self, **state):
+        self.plt.show()
+
+def kmeanssegment(imgdata, k, max_its, observers=None):
 
     """ Simple k-means image segmentation.
-        Ian Jeffrey - April 2020. """
+        Ian Jeffrey - April 2020.
+
+        Headless: progress is only reported to the given observers (see progress.py),
+        e.g. PrintObserver or KMeansPlotObserver. """
+
+    if observers is None:
+        observers = []
 
     #get image size
     m = len(imgdata)
     n = len(imgdata[0])
 
-    imgdata_copy = copy.copy(imgdata)
-
     #initialize k means
     mean_vector = np.ndarray(shape=(k,3), dtype=float)
     new_mean_vector = np.ndarray(shape=(k,3), dtype=float)
@@ -44,8 +76,6 @@ def kmeanssegment(imgdata, k, max_its):
 
     #stat iterations
     while iteration <= max_its:
-        print("k means iteration ", iteration, " of ", max_its)
-        
         #calculate distances to each mean (matrix operations would be far better here!)
         for row in range(0,m):
             for col in range(0,n):
@@ -80,44 +110,25 @@ def kmeanssegment(imgdata, k, max_its):
         #update the mean vector (could have just overwritten mean to begin with but... debugging.)
         mean_vector = new_mean_vector
     
-        print("After iteration ", iteration, " the means are: \n", mean_vector)
-    
-        #produce an image that shows the means for each pixel (just for visualization)
-        for row in range(0,m):
-            for col in range(0,n):
-                mean_index = mean_index_for_pixel[row][col]
-                imgdata_copy[row,col,0:3] = mean_vector[mean_index,:]
-                
-        #plot some results
-        if iteration%1 == 0:
-            ax1.set_title('Original Image',fontsize=11)
-            ax2.set_title(['K-Means at Iteration ',iteration],fontsize=11)
-            ax3.set_title(['Groups at Iteration ', iteration],fontsize=11)
-            ax1.matshow(imgdata)
-            ax2.matshow(imgdata_copy)
-            ax3.matshow(mean_index_for_pixel)
-            ax1.xaxis.set_ticks_position('bottom')
-            ax2.xaxis.set_ticks_position('bottom')
-            ax3.xaxis.set_ticks_position('bottom')
-            plt.pause(0.005)
+        #update the observers
+        if observersdue(observers, iteration):
+            notifyobservers(observers, iteration, imgdata=imgdata, mean_vector=mean_vector, mean_index_for_pixel=mean_index_for_pixel)
             
         iteration += 1
             
-    plt.show()
+    finishobservers(observers, mean_vector=mean_vector, mean_index_for_pixel=mean_index_for_pixel)
 
     return mean_vector, mean_index_for_pixel
 
 #main
-filename="./zoo-4821484_640.png" #grab your favourite image to try
-
-imgdata = mpimg.imread(filename, 1) #read as unit format
-
-k = 4
-maxits = 10
-mean_vector, mean_for_pixel = kmeanssegment(imgdata,k, maxits)
-
-
-
+if __name__ == "__main__":
+    from matplotlib import image as mpimg
 
+    filename="./zoo-4821484_640.png" #grab your favourite image to try
 
+    imgdata = mpimg.imread(filename, 1) #read as unit format
 
+    k = 4
+    maxits = 10
+    observers = [PrintObserver(['mean_vector'], prefix="After k means iteration"), KMeansPlotObserver()]
+    mean_vector, mean_for_pixel = kmeanssegment(imgdata,k, maxits, observers)
@@ -0,0 +1,217 @@
+"""
+Benchmark harness for the algorithm scripts.
+
+Sweeps problem sizes for each variant of an algorithm (maximum subarray, rod
+cutting, activity scheduling, knapsacks), reports median times and an estimated
+complexity exponent per variant, writes the results as JSON and flags
+regressions against a previously saved baseline.
+
+Usage:
+    python benchmark.py --output results.json
+    python benchmark.py --baseline results.json --tolerance 0.25
+"""
+
+import numpy as np
+import sys
+import os
+import json
+import argparse
+import operator
+import importlib.util
+from timeit import default_timer as timer
+
+def loadscript(filename, name=None):
+    """Import one of the numbered algorithm scripts as a module.
+
+    The scripts have file names that are not valid module names, so they are loaded
+    by path (their demo code only runs under __main__). The module is registered in
+    sys.modules under name so that process pools can pickle its functions.
+    """
+    if name is None:
+        name = os.path.splitext(os.path.basename(filename))[0].split('_', 1)[1].replace(' ', '').lower()
+    if name in sys.modules:
+        return sys.modules[name]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+class Suite:
+    """A set of variants of one algorithm, timed over a sweep of problem sizes.
+
+    setup(n) returns the argument tuple for a problem of size n, and every variant
+    is called as variant(*setup(n)). A variant can be limited to sizes up to a
+    maximum (e.g. exponential algorithms) with maxsize.
+    """
+
+    def __init__(self, name, sizes, setup, variants, maxsize=None):
+        self.name = name
+        self.sizes = sizes
+        self.setup = setup
+        self.variants = variants
+        self.maxsize = maxsize if maxsize is not None else {}
+
+    def __repr__(self):
+        return str("Benchmark suite ") + self.name + str(list(self.variants.keys()))
+    def __str__(self):
+        return self.__repr__()
+
+def timefunction(f, args, warmup=1, repeats=5):
+    """Return the median wall time of f(*args) over repeats runs after warmup runs."""
+    for i in range(0, warmup):
+        f(*args)
+    times = np.zeros(repeats)
+    for i in range(0, repeats):
+        start_time = timer()
+        f(*args)
+        end_time = timer()
+        times[i] = end_time - start_time
+    return float(np.median(times))
+
+def complexityexponent(sizes, times):
+    """Estimate k in time ~ n^k from a least squares fit in log-log space."""
+    sizes = np.asarray(sizes, dtype=float)
+    times = np.asarray(times, dtype=float)
+    keep = (sizes > 0) & (times > 0)
+    if np.count_nonzero(keep) < 2:
+        return None
+    slope, intercept = np.polyfit(np.log(sizes[keep]), np.log(times[keep]), 1)
+    return float(slope)
+
+def runsuite(suite, warmup=1, repeats=5, verbose=True):
+    """Time every variant of suite over its sizes, returning a JSON-friendly dictionary."""
+    results = {}
+    for variant_name in suite.variants:
+        results[variant_name] = {'sizes': [], 'median_seconds': []}
+
+    for n in suite.sizes:
+        np.random.seed(n)   #same inputs for every variant and every run
+        args = suite.setup(n)
+        for variant_name, variant in suite.variants.items():
+            if n > suite.maxsize.get(variant_name, float('Inf')):
+                continue
+            median = timefunction(variant, args, warmup, repeats)
+            results[variant_name]['sizes'].append(n)
+            results[variant_name]['median_seconds'].append(median)
+            if verbose:
+                print(suite.name, "/", variant_name, " n = ", n, " median = ", median, "s")
+
+    for variant_name in results:
+        results[variant_name]['exponent'] = complexityexponent(results[variant_name]['sizes'], results[variant_name]['median_seconds'])
+        if verbose:
+            print(suite.name, "/", variant_name, " estimated complexity ~ n^", results[variant_name]['exponent'])
+
+    return results
+
+def findregressions(results, baseline, tolerance=0.25):
+    """Compare results to a baseline of the same shape.
+
+    Returns a list of (suite, variant, n, baseline seconds, current seconds) for every
+    size that got slower by more than the tolerance fraction.
+    """
+    regressions = []
+    for suite_name, variants in results.items():
+        for variant_name, result in variants.items():
+            old = baseline.get(suite_name, {}).get(variant_name)
+            if old is None:
+                continue
+            old_times = dict(zip(old['sizes'], old['median_seconds']))
+            for n, seconds in zip(result['sizes'], result['median_seconds']):
+                if n in old_times and seconds > old_times[n]*(1.0 + tolerance):
+                    regressions.append((suite_name, variant_name, n, old_times[n], seconds))
+    return regressions
+
+def defaultsuites():
+    """The benchmark suites for the algorithm scripts."""
+    maximumsubarray = loadscript('1_MaximumSubarray.py')
+    dynamicrodcut = loadscript('3_DynamicRodCut.py')
+    activityscheduling = loadscript('4_ActivityScheduling.py')
+    knapsacks = loadscript('5_Knapsacks.py')
+
+    def subarraysetup(n):
+        A = np.random.randint(-10, 10, n)
+        return (A,)
+
+    def rodcutsetup(n):
+        p = np.random.randint(1, n+1, n)
+        return (p, n)
+
+    def schedulingsetup(n):
+        activity_set = [activityscheduling.SimpleActivity(0, 0)]
+        starts = np.random.randint(0, 60, n)
+        for i in range(0, n):
+            activity_set.append(activityscheduling.SimpleActivity(starts[i], np.random.randint(starts[i] + 1, 61)))
+        activity_set.sort(key=operator.attrgetter('finish_time'))
+        return (activity_set,)
+
+    def recursiveschedule(activity_set):
+        schedule = []
+        activityscheduling.RecursiveGreedySchedule(activity_set, 0, len(activity_set), schedule)
+        return schedule
+
+    def knapsacksetup(n):
+        item_set = []
+        for i in range(0, n):
+            item_set.append(knapsacks.ItemOfValue(np.random.randint(1, 100), np.random.randint(1, 100)))
+        item_set.sort(key=operator.attrgetter('per_unit_value'), reverse=True)
+        return (item_set, 25*n)
+
+    def greedyknapsack(item_set, W):
+        knapsack = []
+        knapsacks.RecursiveGreedyKnapsack(item_set, 0, len(item_set), W, knapsack)
+        return knapsack
+
+    return [
+        Suite('maximum subarray', [64, 128, 256, 512], subarraysetup, {
+            'divide and conquer': lambda A: maximumsubarray.findmaximumsubarray(A, 0, len(A) - 1),
+            'brute force': maximumsubarray.bruteforcemaximumsubarray,
+            'kadane': maximumsubarray.kadanemaximumsubarray,
+        }, maxsize={'brute force': 128}),
+        Suite('rod cutting', [8, 12, 16, 64, 256], rodcutsetup, {
+            'recursive': dynamicrodcut.recursiverodcut,
+            'memoized': dynamicrodcut.memoizedrodcut,
+            'bottom up': dynamicrodcut.bottomuprodcut,
+        }, maxsize={'recursive': 16}),
+        Suite('activity scheduling', [100, 200, 400, 800], schedulingsetup, {
+            'recursive greedy': recursiveschedule,
+            'iterative greedy': activityscheduling.IterativeGreedySchedule,
+        }),
+        Suite('knapsack', [4, 6, 8, 10], knapsacksetup, {
+            'greedy': greedyknapsack,
+            'dynamic': knapsacks.DynamicKnapsack,
+        }),
+    ]
+
+#main point of entry
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the algorithm scripts over a sweep of problem sizes.")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--baseline', help="JSON file from a previous run to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown fraction before flagging a regression")
+    parser.add_argument('--warmup', type=int, default=1, help="untimed runs before timing")
+    parser.add_argument('--repeats', type=int, default=5, help="timed runs per size (the median is reported)")
+    parser.add_argument('--suite', action='append', help="only run suites with this name (may be repeated)")
+    args = parser.parse_args()
+
+    results = {}
+    for suite in defaultsuites():
+        if args.suite and suite.name not in args.suite:
+            continue
+        results[suite.name] = runsuite(suite, args.warmup, args.repeats)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print("Results written to ", args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = findregressions(results, baseline, args.tolerance)
+        for suite_name, variant_name, n, old, new in regressions:
+            print("REGRESSION ", suite_name, "/", variant_name, " n = ", n, ": ", old, "s -> ", new, "s")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against ", args.baseline)
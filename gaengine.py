@@ -0,0 +1,432 @@
+"""
+A reusable genetic algorithm engine.
+
+A GeneticAlgorithm is put together from pluggable components:
+
+    genome      how genes are created, crossed over and mutated, and how a population
+                is stored (a Genome subclass, e.g. BitGenome for bit-packed genes)
+    fitness     fitness(population) returns the fitness of every gene, higher is better
+    selection   selection(fitness, count) returns count population indexes of parents,
+                e.g. rouletteselection or tournamentselection
+
+Each generation keeps the elite_size fittest genes, and breeds the rest of the
+population from selected parents. Fitness goes through a least recently used cache
+(see memoization.py), so unchanged and duplicate genes are not evaluated again.
+
+An IslandModel runs several GeneticAlgorithm instances (islands) in their own
+processes. Every migration_interval generations the fittest genes of each island
+migrate to its neighbours in a topology ('ring', 'all' or 'random', or explicit lists
+of neighbours), replacing their least fit genes. Components must be picklable
+(module level functions and classes) to run in processes.
+"""
+
+import numpy as np
+import copy
+import random
+import multiprocessing
+from memoization import Memo
+from progress import observersdue, notifyobservers, finishobservers
+
+def rouletteselection(fitness, count):
+    """Select count population indexes with probability proportional to fitness.
+
+    Uses np.searchsorted on the cumulative fitness rather than a lottery array, so
+    the cost does not grow with the total fitness. If no gene has any fitness the
+    selection is uniform.
+    """
+    cumulative_fitness = np.cumsum(fitness, dtype=float)
+    if cumulative_fitness[-1] <= 0:
+        return np.random.randint(len(fitness), size=count)
+    tickets = np.random.rand(count)*cumulative_fitness[-1]
+    #a ticket can round up to the total, which would select past the last gene
+    return np.minimum(np.searchsorted(cumulative_fitness, tickets, side='right'), len(fitness) - 1)
+
+def tournamentselection(fitness, count, tournament_size=2):
+    """Select count population indexes, each the fittest of tournament_size random genes."""
+    entrants = np.random.randint(len(fitness), size=(count, tournament_size))
+    winners = np.argmax(np.asarray(fitness)[entrants], axis=1)
+    return entrants[np.arange(count), winners]
+
+def crossovermasks(gene_size):
+    """Precompute the bit-packed single point crossover masks.
+
+    Row c has the bits from c to the end of the gene set, so swapping the masked bits
+    of two parents swaps their tails from crossover index c.
+    """
+    bits = np.arange(gene_size)[None, :] >= np.arange(gene_size + 1)[:, None]
+    return np.packbits(bits, axis=1)
+
+def packedcrossover(parents1, parents2, masks, crossover_percent):
+    """Single point crossover of every pair of bit-packed parents (rows) at once.
+
+    Each pair is crossed over with probability crossover_percent at a random index,
+    using the masks from crossovermasks(); pairs that are not crossed over are copied.
+    """
+    num_pairs = len(parents1)
+    gene_size = len(masks) - 1
+    crossover_indexes = np.random.randint(gene_size, size=num_pairs)
+    crossover_indexes[np.random.rand(num_pairs) > crossover_percent] = gene_size #the empty mask: no crossover
+    swap = (parents1 ^ parents2) & masks[crossover_indexes]
+    return parents1 ^ swap, parents2 ^ swap
+
+def mutationmasks(count, gene_size, mutation_percent):
+    """Bit-packed Bernoulli masks: each of the gene_size bits is set with probability mutation_percent.
+
+    XOR a population with these masks to toggle the mutated bits.
+    """
+    return np.packbits(np.random.rand(count, gene_size) < mutation_percent, axis=1)
+
+
+class Genome:
+    """Base genome: a population is a list of genes.
+
+    Subclasses provide random(), crossover() and mutate(), and may store populations
+    differently by overriding take(), concatenate() and key().
+    """
+
+    def random(self, count):
+        """Return a population of count random genes."""
+        raise NotImplementedError
+
+    def crossover(self, parents1, parents2):
+        """Mate parents1[i] with parents2[i], returning two populations of children."""
+        raise NotImplementedError
+
+    def mutate(self, population):
+        """Return the population with mutations applied."""
+        raise NotImplementedError
+
+    def take(self, population, indexes):
+        """The sub population at indexes."""
+        return [population[i] for i in indexes]
+
+    def concatenate(self, populations):
+        """The populations joined into one."""
+        return [gene for population in populations for gene in population]
+
+    def key(self, gene):
+        """A hashable key identifying the gene, for the fitness cache."""
+        return tuple(gene)
+
+class BitGenome(Genome):
+    """Binary genes of gene_size bits, stored bit-packed as rows of a uint8 array.
+
+    Single point crossover of each pair with probability crossover_percent, and each
+    bit toggles with probability mutation_percent.
+    """
+
+    def __init__(self, gene_size, crossover_percent=0.7, mutation_percent=0.1):
+        self.gene_size = gene_size
+        self.crossover_percent = crossover_percent
+        self.mutation_percent = mutation_percent
+        self.masks = crossovermasks(gene_size)
+
+    def __repr__(self):
+        return str("BitGenome") + str({'gene_size': self.gene_size, 'crossover_percent': self.crossover_percent, 'mutation_percent': self.mutation_percent})
+    def __str__(self):
+        return self.__repr__()
+
+    def random(self, count):
+        return np.packbits(np.random.randint(2, size=[count, self.gene_size]).astype(np.uint8), axis=1)
+
+    def crossover(self, parents1, parents2):
+        return packedcrossover(parents1, parents2, self.masks, self.crossover_percent)
+
+    def mutate(self, population):
+        return population ^ mutationmasks(len(population), self.gene_size, self.mutation_percent)
+
+    def take(self, population, indexes):
+        return population[indexes]
+
+    def concatenate(self, populations):
+        return np.concatenate(populations)
+
+    def key(self, gene):
+        return gene.tobytes()
+
+    def unpack(self, gene):
+        """The gene as an array of 0/1."""
+        return np.unpackbits(gene, count=self.gene_size).astype(np.int64)
+
+
+class GeneticAlgorithm:
+    """A genetic algorithm over one population, assembled from a genome, a fitness and a selection."""
+
+    def __init__(self, genome, fitness, population_size, selection=rouletteselection, elite_size=0, cache_size=4096):
+        self.genome = genome
+        self.fitness_function = fitness
+        self.population_size = population_size
+        self.selection = selection
+        self.elite_size = elite_size
+        self.cache_size = cache_size
+        self.cache = None       #created by initialize(), so an unstarted engine can be pickled
+        self.population = None
+        self.fitness = None
+        self.generation = 0
+
+    def __repr__(self):
+        return str("GeneticAlgorithm") + str({'genome': self.genome, 'population_size': self.population_size, 'elite_size': self.elite_size, 'generation': self.generation})
+    def __str__(self):
+        return self.__repr__()
+
+    def evaluate(self, population):
+        """The fitness of every gene of population, through the cache."""
+        if self.cache_size <= 0:
+            return np.asarray(self.fitness_function(population), dtype=float)
+        return np.array(self.cache.evaluatemany(lambda indexes: self.fitness_function(self.genome.take(population, indexes)),
+                                                [self.genome.key(gene) for gene in population]), dtype=float)
+
+    def hitrate(self):
+        """The fitness cache hit rate."""
+        return self.cache.hitrate()
+
+    def initialize(self):
+        """Create and evaluate a random population."""
+        self.cache = Memo(maxsize=self.cache_size)
+        self.generation = 0
+        self.setpopulation(self.genome.random(self.population_size), None)
+        self.best_gene = copy.copy(self.population_best_gene)
+        self.best_fitness = self.population_best_fitness
+
+    def setpopulation(self, population, fitness):
+        """Make population the current population (evaluating it if fitness is None)."""
+        self.population = population
+        self.fitness = self.evaluate(population) if fitness is None else fitness
+        best_index = np.argmax(self.fitness)
+        self.population_best_fitness = self.fitness[best_index]
+        self.population_best_gene = copy.copy(self.population[best_index])
+
+    def step(self):
+        """Produce and evaluate the next generation."""
+        if self.population is None:
+            self.initialize()
+        self.generation += 1
+
+        #elitism: the fittest genes carry over unchanged
+        elites = np.argsort(-self.fitness, kind='stable')[:self.elite_size]
+        num_children = self.population_size - len(elites)
+        num_pairs = (num_children + 1)//2 #we mate pairs, so take half the children
+
+        #selection, crossover and mutation
+        parents = self.selection(self.fitness, 2*num_pairs)
+        children1, children2 = self.genome.crossover(self.genome.take(self.population, parents[0::2]),
+                                                     self.genome.take(self.population, parents[1::2]))
+        children = self.genome.take(self.genome.concatenate([children1, children2]), np.arange(num_children))
+        children = self.genome.mutate(children)
+
+        self.setpopulation(self.genome.concatenate([self.genome.take(self.population, elites), children]), None)
+        if self.population_best_fitness > self.best_fitness:
+            self.best_fitness = self.population_best_fitness
+            self.best_gene = copy.copy(self.population_best_gene)
+
+    def elites(self, count):
+        """The count fittest genes and their fitness."""
+        indexes = np.argsort(-self.fitness, kind='stable')[:count]
+        return self.genome.take(self.population, indexes), self.fitness[indexes]
+
+    def immigrate(self, genes, fitness):
+        """Replace the least fit genes of the population with genes of known fitness."""
+        keep = np.argsort(-self.fitness, kind='stable')[:max(self.population_size - len(fitness), 0)]
+        self.setpopulation(self.genome.concatenate([self.genome.take(self.population, keep), genes]),
+                           np.concatenate((self.fitness[keep], fitness)))
+
+    def state(self):
+        """The state passed to observers."""
+        return {'population_best_fitness': self.population_best_fitness, 'population_best_gene': self.population_best_gene,
+                'best_fitness': self.best_fitness, 'best_gene': self.best_gene, 'cache_hitrate': self.hitrate()}
+
+    def run(self, generations, observers=None):
+        """Evolve for generations, notifying the observers (see progress.py) every generation.
+
+        Returns the best gene found and its fitness.
+        """
+        if observers is None:
+            observers = []
+        if self.population is None:
+            self.initialize()
+            if observers:
+                notifyobservers(observers, self.generation, **self.state())
+        for i in range(0, generations):
+            self.step()
+            if observersdue(observers, self.generation):
+                notifyobservers(observers, self.generation, **self.state())
+        finishobservers(observers, **self.state())
+        return self.best_gene, self.best_fitness
+
+
+def migrationsources(topology, num_islands):
+    """For each island, the list of islands whose elites migrate to it.
+
+    topology is 'ring' (from the previous island), 'all' (from every other island),
+    'random' (from one other island, chosen anew at each migration) or a list giving
+    the sources of each island.
+    """
+    if num_islands < 2:
+        return [[] for island in range(0, num_islands)]
+    if topology == 'ring':
+        return [[(island - 1) % num_islands] for island in range(0, num_islands)]
+    if topology == 'all':
+        return [[source for source in range(0, num_islands) if source != island] for island in range(0, num_islands)]
+    if topology == 'random':
+        offsets = np.random.randint(1, num_islands, size=num_islands)
+        return [[(island + offsets[island]) % num_islands] for island in range(0, num_islands)]
+    if len(topology) != num_islands:
+        raise ValueError("Topology must list the sources of each of the " + str(num_islands) + " islands")
+    return [list(sources) for sources in topology]
+
+def _evolveisland(engine, generations, immigrants, migration_size):
+    """Take in the immigrants, evolve an island for generations and report its emigrants and best."""
+    if engine.population is None:
+        engine.initialize()
+    if immigrants is not None:
+        engine.immigrate(*immigrants)
+    for i in range(0, generations):
+        engine.step()
+    return (engine.elites(migration_size), engine.population_best_gene, engine.population_best_fitness,
+            engine.best_gene, engine.best_fitness, engine.cache.hits, engine.cache.misses)
+
+def _islandworker(connection, engine, seed):
+    """Island process: evolve on request until told to stop."""
+    np.random.seed(seed)
+    random.seed(seed)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+        connection.send(_evolveisland(engine, *message))
+    connection.close()
+
+
+class IslandModel:
+    """Run GeneticAlgorithm islands in separate processes, migrating elites between them.
+
+    Each step() evolves every island for migration_interval generations in parallel,
+    then the migration_size fittest genes of each island are sent to the islands that
+    take from it in the topology (see migrationsources()). Observer intervals count
+    these migrations, so an observer with interval k is updated after every k-th one.
+    With processes=False the islands run one after another in this process. Use as a
+    context manager so the processes are stopped.
+    """
+
+    def __init__(self, engines, migration_interval=20, migration_size=2, topology='ring', seed=None, processes=True):
+        self.engines = engines
+        self.genome = engines[0].genome
+        self.migration_interval = migration_interval
+        self.migration_size = migration_size
+        self.topology = topology
+        self.generation = 0
+        self.migrations = 0
+        self.immigrants = [None]*len(engines)
+        self.started = False
+        self.use_processes = processes
+
+        #every island gets its own random stream, also when the processes are forked
+        seeds = [int(sequence.generate_state(1)[0]) for sequence in np.random.SeedSequence(seed).spawn(len(engines))]
+        self.connections = []
+        self.processes = []
+        if processes:
+            for engine, island_seed in zip(engines, seeds):
+                connection, worker_connection = multiprocessing.Pipe()
+                process = multiprocessing.Process(target=_islandworker, args=(worker_connection, engine, island_seed), daemon=True)
+                process.start()
+                worker_connection.close()
+                self.connections.append(connection)
+                self.processes.append(process)
+        else:
+            self.seeds = seeds
+
+    def __repr__(self):
+        return str("IslandModel") + str({'islands': len(self.engines), 'migration_interval': self.migration_interval, 'migration_size': self.migration_size, 'topology': self.topology, 'generation': self.generation})
+    def __str__(self):
+        return self.__repr__()
+
+    def evolve(self, generations):
+        """Evolve every island for generations (taking in any immigrants first) and collect the results."""
+        if self.use_processes:
+            for connection, immigrants in zip(self.connections, self.immigrants):
+                connection.send((generations, immigrants, self.migration_size))
+            results = [connection.recv() for connection in self.connections]
+        else:
+            results = []
+            for island, (engine, immigrants) in enumerate(zip(self.engines, self.immigrants)):
+                np.random.seed(self.seeds[island])
+                random.seed(self.seeds[island])
+                results.append(_evolveisland(engine, generations, immigrants, self.migration_size))
+                self.seeds[island] = np.random.randint(2**31)   #continue from a new seed next time
+        self.immigrants = [None]*len(self.engines)
+        self.generation += generations
+
+        #the best of all islands
+        self.emigrants = [result[0] for result in results]
+        self.island_best_fitness = [result[2] for result in results]
+        population_best = int(np.argmax(self.island_best_fitness))
+        self.population_best_gene = results[population_best][1]
+        self.population_best_fitness = results[population_best][2]
+        overall_best = int(np.argmax([result[4] for result in results]))
+        self.best_gene = results[overall_best][3]
+        self.best_fitness = results[overall_best][4]
+        self.hits = sum(result[5] for result in results)
+        self.misses = sum(result[6] for result in results)
+
+    def initialize(self):
+        """Create and evaluate the population of every island."""
+        self.evolve(0)
+        self.started = True
+
+    def migrate(self):
+        """Send the elites of each island to the islands that take from it."""
+        for island, sources in enumerate(migrationsources(self.topology, len(self.engines))):
+            if sources:
+                self.immigrants[island] = (self.genome.concatenate([self.emigrants[source][0] for source in sources]),
+                                           np.concatenate([self.emigrants[source][1] for source in sources]))
+
+    def step(self, generations=None):
+        """Evolve every island for generations (default migration_interval), then migrate."""
+        if not self.started:
+            self.initialize()
+        self.evolve(self.migration_interval if generations is None else generations)
+        self.migrate()
+        self.migrations += 1
+
+    def hitrate(self):
+        """The fitness cache hit rate over all islands."""
+        lookups = self.hits + self.misses
+        return self.hits/lookups if lookups > 0 else 0.0
+
+    def state(self):
+        """The state passed to observers."""
+        return {'population_best_fitness': self.population_best_fitness, 'population_best_gene': self.population_best_gene,
+                'best_fitness': self.best_fitness, 'best_gene': self.best_gene, 'cache_hitrate': self.hitrate(),
+                'island_best_fitness': self.island_best_fitness}
+
+    def run(self, generations, observers=None):
+        """Evolve for generations, migrating every migration_interval generations. The observers
+        (see progress.py) count migrations, so interval=1 notifies after every migration.
+
+        Returns the best gene found and its fitness.
+        """
+        if observers is None:
+            observers = []
+        if not self.started:
+            self.initialize()
+            notifyobservers(observers, self.generation, **self.state())
+        end = self.generation + generations
+        while self.generation < end:
+            self.step(min(self.migration_interval, end - self.generation))
+            notifyobservers(observers, self.generation, step=self.migrations, **self.state())
+        finishobservers(observers, **self.state())
+        return self.best_gene, self.best_fitness
+
+    def close(self):
+        for connection in self.connections:
+            connection.send(None)
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def __enter__(self):
+        return self
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,157 @@
+"""
+Shared memoization for the recursive solvers.
+
+A Memo is a (optionally bounded, least recently used) table of results with a
+configurable key function and hit/miss/eviction counters. evaluatemany() puts a
+batch through the memo, e.g. as a fitness cache for a population. Used as a decorator it
+memoizes a function. If the decorated function is a generator, every
+`yield args` inside it is a memoized recursive call evaluated on an explicit
+stack, so the recursion depth is not limited by Python's recursion limit:
+
+    def fib(n):
+        if n < 2:
+            return n
+        return (yield (n-1,)) + (yield (n-2,))
+
+    fib = memoize()(fib)
+"""
+
+import collections
+import inspect
+import pickle
+
+class Memo:
+    """A memo table with a key function, optional LRU bound and usage counters."""
+
+    def __init__(self, maxsize=None, key=None):
+        self.maxsize = maxsize      #None means unbounded
+        self.key = key if key is not None else (lambda *args: args)
+        self.table = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self):
+        return str("Memo") + str({'entries': len(self.table), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'hitrate': self.hitrate()})
+    def __str__(self):
+        return self.__repr__()
+
+    def __len__(self):
+        return len(self.table)
+
+    def hitrate(self):
+        """The fraction of lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits/lookups if lookups > 0 else 0.0
+
+    def lookup(self, key):
+        """Return (True, value) if key is memoized, otherwise (False, None)."""
+        if key in self.table:
+            self.hits += 1
+            if self.maxsize is not None:
+                self.table.move_to_end(key)
+            return True, self.table[key]
+        self.misses += 1
+        return False, None
+
+    def store(self, key, value):
+        """Write the memo for key, evicting the least recently used entries if bounded."""
+        self.table[key] = value
+        if self.maxsize is not None:
+            self.table.move_to_end(key)
+            while len(self.table) > self.maxsize:
+                self.table.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Forget every memo and reset the counters."""
+        self.table.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def save(self, filename):
+        """Persist the memo table to a file."""
+        with open(filename, 'wb') as f:
+            pickle.dump(list(self.table.items()), f)
+
+    def load(self, filename):
+        """Add the memos saved in a file to this table."""
+        with open(filename, 'rb') as f:
+            for key, value in pickle.load(f):
+                self.store(key, value)
+
+    def evaluate(self, f, args):
+        """Evaluate f(*args) through the memo.
+
+        For a generator function f, each value yielded by f is the argument tuple of a
+        recursive call whose result is sent back in. Calls are kept on an explicit
+        stack rather than the Python call stack.
+        """
+        key = self.key(*args)
+        found, value = self.lookup(key)
+        if found:
+            return value
+        if not inspect.isgeneratorfunction(f):
+            value = f(*args)
+            self.store(key, value)
+            return value
+
+        stack = [(key, f(*args))]
+        value = None
+        while stack:
+            key, generator = stack[-1]
+            try:
+                subargs = generator.send(value)
+            except StopIteration as result:  #this call is finished
+                stack.pop()
+                value = result.value
+                self.store(key, value)
+                continue
+            subkey = self.key(*subargs)
+            found, value = self.lookup(subkey)
+            if not found:
+                stack.append((subkey, f(*subargs)))
+                value = None
+        return value
+
+    def evaluatemany(self, f, keys):
+        """Evaluate a batch through the memo, with one key per item of the batch.
+
+        f(indexes) is called once with the indexes of the items whose key is not
+        memoized (only the first of any duplicate keys) and returns their values in
+        order. Returns the list of values for the whole batch.
+        """
+        values = [None]*len(keys)
+        missed = {}     #key -> indexes of the items waiting for it
+        for i, key in enumerate(keys):
+            if key in missed:   #a duplicate within the batch is evaluated once
+                self.hits += 1
+                missed[key].append(i)
+                continue
+            found, value = self.lookup(key)
+            if found:
+                values[i] = value
+            else:
+                missed[key] = [i]
+        if missed:
+            indexes = [waiting[0] for waiting in missed.values()]
+            for key, value in zip(missed, f(indexes)):
+                self.store(key, value)
+                for i in missed[key]:
+                    values[i] = value
+        return values
+
+    def __call__(self, f):
+        """Decorate f so every call goes through this memo."""
+        def memoized(*args):
+            return self.evaluate(f, args)
+        memoized.__name__ = f.__name__
+        memoized.__doc__ = f.__doc__
+        memoized.__wrapped__ = f
+        memoized.memo = self
+        return memoized
+
+def memoize(maxsize=None, key=None):
+    """Decorator factory: memoize a function with a new Memo(maxsize, key)."""
+    return Memo(maxsize, key)
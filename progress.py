@@ -0,0 +1,65 @@
+"""
+Progress observers for the iterative solvers (GA, simulated annealing, k-means).
+
+The solvers are headless: they do no printing or plotting themselves. Instead
+they accept a list of observers and, if any are given, pass them the solver
+state every iteration. Each observer only acts every `interval` iterations,
+so reporting costs nothing unless asked for.
+"""
+
+class Observer:
+    """Base observer: update() is called every interval iterations, finish() once at the end."""
+
+    def __init__(self, interval=1):
+        self.interval = interval
+
+    def update(self, iteration, **state):
+        pass
+
+    def finish(self, **state):
+        pass
+
+class PrintObserver(Observer):
+    """Print the iteration and some fields of the solver state."""
+
+    def __init__(self, fields, interval=1, prefix="iteration"):
+        super().__init__(interval)
+        self.fields = fields
+        self.prefix = prefix
+
+    def update(self, iteration, **state):
+        print(self.prefix, iteration, *[str(field) + " = " + str(state[field]) for field in self.fields])
+
+class CallbackObserver(Observer):
+    """Call function(iteration, **state), e.g. to record a history or log to a file."""
+
+    def __init__(self, function, interval=1):
+        super().__init__(interval)
+        self.function = function
+
+    def update(self, iteration, **state):
+        self.function(iteration, **state)
+
+def observersdue(observers, iteration, step=None):
+    """Whether any observer is due at this iteration, so state that is costly to
+    build (e.g. a plot image) is only built when it will be used.
+
+    If step is given the intervals count steps instead of iterations, for solvers
+    that advance several iterations at a time (e.g. the migrations of an IslandModel).
+    """
+    if step is None:
+        step = iteration
+    return any(step % observer.interval == 0 for observer in observers)
+
+def notifyobservers(observers, iteration, step=None, **state):
+    """Pass the state to every observer due at this iteration (or step, see observersdue())."""
+    if step is None:
+        step = iteration
+    for observer in observers:
+        if step % observer.interval == 0:
+            observer.update(iteration, **state)
+
+def finishobservers(observers, **state):
+    """Tell every observer the solver is done."""
+    for observer in observers:
+        observer.finish(**state)